@@ -1,20 +1,42 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-from io import BytesIO
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
-import re
+from functools import partial
+from collections import OrderedDict
+import json
+import os
+import shutil
+import tempfile
+import time
+import weakref
 
-# ==================== PAGE CONFIGURATION ====================
-st.set_page_config(
-    page_title="Richard Data Cleaning System",
-    page_icon="",
-    layout="wide",
-    initial_sidebar_state="expanded"
+from cleaning_engine import (
+    CORRELATION_ANNOTATE_MAX, CORRELATION_SAMPLE_ROWS, CSV_CHUNK_ROWS, CSV_COMPRESSIONS,
+    CURRENCY_FORMAT_NAMES, DEFAULT_PROFILE_WORKERS, FEATHER_COMPRESSIONS, LINE_POINT_BUDGET,
+    MISSING_TOKENS, PARQUET_COMPRESSIONS, PARQUET_ROW_GROUP_SIZE, SCATTER_POINT_BUDGET, TEXT_DTYPES,
+    apply_step, box_stats, clustered_order, compact_dtypes, content_hash, correlation_matrix,
+    dataset_stats, density_grid, describe_step, detect_column_type, detect_missing_patterns,
+    downsample_line, export_csv, export_excel, export_feather, export_json, export_ndjson,
+    export_parquet, frame_summary, histogram_stats, infer_currency_format, load_recipe,
+    lru_get, lru_put, make_step, map_columns, missing_treatment_step, mmap_frame, read_table,
+    recipe_to_json, sample_positions, shared_cache_get, shared_cache_put, shared_cache_stats,
+    top_correlations
 )
 
+# ==================== PAGE CONFIGURATION ====================
+
+def configure_page():
+    """Set the page layout; must be the first Streamlit call of a run"""
+    st.set_page_config(
+        page_title="Richard Data Cleaning System",
+        page_icon="",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+
 # ==================== CUSTOM CSS STYLING ====================
 def load_custom_css():
     st.markdown("""
@@ -279,145 +301,635 @@ def initialize_session_state():
     """Initialize all session state variables"""
     if 'df_original' not in st.session_state:
         st.session_state.df_original = None
+    if 'original_shape' not in st.session_state:
+        st.session_state.original_shape = None
+    if 'dataset_name' not in st.session_state:
+        st.session_state.dataset_name = None
     if 'df_working' not in st.session_state:
         st.session_state.df_working = None
     if 'cleaning_log' not in st.session_state:
         st.session_state.cleaning_log = []
     if 'column_types' not in st.session_state:
         st.session_state.column_types = {}
+    if 'dataset_lease' not in st.session_state:
+        st.session_state.dataset_lease = None
+    if 'file_fingerprints' not in st.session_state:
+        st.session_state.file_fingerprints = {}
+    if 'missing_masks' not in st.session_state:
+        st.session_state.missing_masks = {}
+    if 'memory_report' not in st.session_state:
+        st.session_state.memory_report = None
+    if 'original_stats' not in st.session_state:
+        st.session_state.original_stats = None
+    if 'working_stats' not in st.session_state:
+        st.session_state.working_stats = None
+    if 'chart_cache' not in st.session_state:
+        st.session_state.chart_cache = OrderedDict()
+    if 'data_version' not in st.session_state:
+        st.session_state.data_version = 0
+    if 'export_cache' not in st.session_state:
+        st.session_state.export_cache = {}
+    if 'currency_report' not in st.session_state:
+        st.session_state.currency_report = None
+    if 'currency_formats' not in st.session_state:
+        st.session_state.currency_formats = None
+    if 'recipe' not in st.session_state:
+        st.session_state.recipe = []
+    if 'undo_stack' not in st.session_state:
+        st.session_state.undo_stack = []
+    if 'redo_stack' not in st.session_state:
+        st.session_state.redo_stack = []
+    if 'profile_workers' not in st.session_state:
+        st.session_state.profile_workers = DEFAULT_PROFILE_WORKERS
+    if 'profile_backend' not in st.session_state:
+        st.session_state.profile_backend = 'thread'
+    if 'column_store' not in st.session_state:
+        st.session_state.column_store = {}
+    if 'column_store_dir' not in st.session_state:
+        st.session_state.column_store_dir = None
+    if 'column_store_token' not in st.session_state:
+        st.session_state.column_store_token = None
 
 def log_action(action):
     """Add action to cleaning log with timestamp"""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     st.session_state.cleaning_log.append(f"[{timestamp}] {action}")
 
-def detect_column_type(series):
-    """Intelligently detect column type based on content analysis"""
-    non_null = series.dropna()
-    if len(non_null) == 0:
-        return {'type': 'empty', 'confidence': 'high'}
-    
-    str_series = non_null.astype(str)
-    
-    # Check for boolean
-    unique_vals = set(str_series.str.lower().unique())
-    bool_patterns = {'true', 'false', 'yes', 'no', '1', '0', 't', 'f', 'y', 'n'}
-    if len(unique_vals) <= 2 and unique_vals.issubset(bool_patterns):
-        return {'type': 'boolean', 'confidence': 'high'}
-    
-    # Check for currency/monetary
-    currency_pattern = r'[$€£¥₹₽₦₨₪₫₩₴₸₵₲₱₡₪₺₼₾₿]|RWF|USD|EUR|GBP'
-    if str_series.str.contains(currency_pattern, regex=True, na=False).any():
-        return {'type': 'currency', 'confidence': 'high'}
-    
-    # Check for datetime
-    try:
-        pd.to_datetime(non_null, errors='raise')
-        return {'type': 'datetime', 'confidence': 'high'}
-    except:
-        date_patterns = [r'\d{4}-\d{2}-\d{2}', r'\d{2}/\d{2}/\d{4}', r'\d{2}-\d{2}-\d{4}']
-        if any(str_series.str.contains(pat, regex=True, na=False).any() for pat in date_patterns):
-            return {'type': 'datetime', 'confidence': 'medium'}
-    
-    # Check for numerical
-    numeric_pattern = r'^-?\d+\.?\d*$'
-    numeric_match = str_series.str.match(numeric_pattern, na=False).sum() / len(str_series)
-    if numeric_match > 0.8:
-        return {'type': 'numerical', 'confidence': 'high'}
-    
-    if pd.api.types.is_numeric_dtype(series):
-        return {'type': 'numerical', 'confidence': 'high'}
-    
-    # Check for categorical
-    unique_ratio = len(non_null.unique()) / len(non_null)
-    if unique_ratio < 0.05 or len(non_null.unique()) < 20:
-        return {'type': 'categorical', 'confidence': 'high'}
-    
-    return {'type': 'text', 'confidence': 'medium'}
-
-def detect_missing_patterns(series):
-    """Detect various forms of missing data"""
-    missing_patterns = ['', ' ', 'NA', 'N/A', 'na', 'n/a', 'NaN', 'nan', 
-                       'NULL', 'null', 'None', 'none', '?', '-', '--', 'n.a.']
-    
-    missing_mask = series.isna() | series.isin(missing_patterns)
-    if series.dtype == 'object':
-        missing_mask |= series.astype(str).str.strip() == ''
-    
-    return missing_mask
-
-def clean_currency_column(series, currency_symbol='$', decimal_sep='.', thousand_sep=','):
-    """Clean currency column and convert to numeric"""
-    cleaned = series.astype(str)
-    
-    # Remove currency symbols
-    for symbol in ['$', '€', '£', '¥', '₹', '₽', '₦', '₨', 'RWF', 'USD', 'EUR', 'GBP']:
-        cleaned = cleaned.str.replace(symbol, '', regex=False)
-    
-    # Handle different formats
-    if decimal_sep == ',' and thousand_sep == '.':
-        cleaned = cleaned.str.replace('.', '', regex=False)
-        cleaned = cleaned.str.replace(',', '.', regex=False)
-    elif thousand_sep == ' ':
-        cleaned = cleaned.str.replace(' ', '', regex=False)
-        if decimal_sep == ',':
-            cleaned = cleaned.str.replace(',', '.', regex=False)
-    else:
-        cleaned = cleaned.str.replace(',', '', regex=False)
+# ==================== CACHING HELPERS ====================
+
+# Parsed uploads are shared by every session of this server process
+SHARED_CACHE_MAX_BYTES = int(os.environ.get('SHARED_CACHE_MAX_MB', 2048)) * 1024**2
+
+def file_fingerprint(uploaded_file):
+    """Compute a content hash of an uploaded file, memoized per upload"""
+    upload_id = getattr(uploaded_file, 'file_id', None)
+    if upload_id is not None and upload_id in st.session_state.file_fingerprints:
+        return st.session_state.file_fingerprints[upload_id]
+    
+    fingerprint = content_hash(uploaded_file)
+    if upload_id is not None:
+        st.session_state.file_fingerprints[upload_id] = fingerprint
+    return fingerprint
+
+def dataset_cache_key(uploaded_file, reader_options, compact):
+    """Shared cache key: file content plus every option that changes the loaded frame"""
+    extension = uploaded_file.name.rsplit('.', 1)[-1].lower()
+    return (file_fingerprint(uploaded_file), extension, tuple(sorted(reader_options.items())), compact)
+
+# ==================== PARALLEL PROFILING ====================
+
+def profiling_options():
+    """Worker settings for map_columns chosen in the sidebar"""
+    return {
+        'max_workers': st.session_state.profile_workers,
+        'backend': st.session_state.profile_backend
+    }
+
+# ==================== WORKING DATA STATE ====================
+
+def missing_tokens():
+    """Built-in missing-value tokens plus any the user added in the Missing Values tab"""
+    extra = st.session_state.get('missing_extra_tokens', '')
+    return MISSING_TOKENS + tuple(token.strip() for token in extra.split(',') if token.strip())
+
+def get_missing_masks(df, columns=None):
+    """Return missing-value masks for the given columns, scanning only uncached ones"""
+    tokens = missing_tokens()
+    if st.session_state.get('missing_masks_tokens') != tokens:
+        st.session_state.missing_masks = {}
+        st.session_state.missing_masks_tokens = tokens
+    
+    masks = st.session_state.missing_masks
+    columns = list(df.columns if columns is None else columns)
+    stale = [col for col in columns if col not in masks or len(masks[col]) != len(df)]
+    if stale:
+        masks.update(map_columns(
+            df, partial(detect_missing_patterns, tokens=tokens), columns=stale, **profiling_options()
+        ))
+    return {col: masks[col] for col in columns}
+
+def bump_data_version():
+    """Mark df_working as changed and drop the chart data and exports built from the old version"""
+    st.session_state.data_version += 1
+    st.session_state.chart_cache.clear()
+    st.session_state.export_cache.clear()
+
+def update_working_df(df, touched_columns=(), keep=None, renamed=None):
+    """Store a new working frame, invalidating only the cached state an operation affected
+    
+    touched_columns are columns whose values changed, keep is the boolean row
+    mask of a row filter and renamed maps old to new column names. Masks of
+    columns that no longer exist are dropped.
+    """
+    masks = st.session_state.missing_masks
+    for old_name, new_name in (renamed or {}).items():
+        if old_name in masks:
+            masks[new_name] = masks.pop(old_name)
+    if keep is not None:
+        keep = np.asarray(keep, dtype=bool)
+        for col in masks:
+            masks[col] = masks[col][keep]
+    for col in touched_columns:
+        masks.pop(col, None)
+    for col in [col for col in masks if col not in df.columns]:
+        del masks[col]
+    
+    store = st.session_state.column_store
+    for old_name, new_name in (renamed or {}).items():
+        if old_name in store:
+            store[new_name] = store.pop(old_name)
+    
+    st.session_state.df_working = back_with_disk(df, columns=None if keep is not None else touched_columns)
+    bump_data_version()
+
+# ==================== DATASET STATISTICS ====================
+
+def get_original_stats():
+    """Statistics of the uploaded dataset, computed when it is loaded"""
+    if st.session_state.original_stats is None:
+        st.session_state.original_stats = dataset_stats(st.session_state.df_original)
+    return st.session_state.original_stats
+
+def get_working_stats():
+    """Summary of df_working, computed once per data version and shared by every tab
+    
+    Only rows, columns and memory are computed up front; costlier figures
+    such as the duplicate count are added on first use.
+    """
+    cached = st.session_state.working_stats
+    if cached is None or cached[0] != st.session_state.data_version:
+        cached = (st.session_state.data_version, frame_summary(st.session_state.df_working))
+        st.session_state.working_stats = cached
+    return cached[1]
+
+def get_duplicate_count():
+    """Number of duplicate rows in df_working, computed on first use per data version"""
+    stats = get_working_stats()
+    if 'duplicates' not in stats:
+        stats['duplicates'] = int(st.session_state.df_working.duplicated().sum())
+    return stats['duplicates']
+
+def get_currency_formats(columns):
+    """Detected number format of each currency column, inferred once per data version"""
+    cached = st.session_state.currency_formats
+    if cached is None or cached[0] != st.session_state.data_version:
+        cached = (st.session_state.data_version, {})
+        st.session_state.currency_formats = cached
+    formats = cached[1]
+    for col in columns:
+        if col not in formats:
+            formats[col] = infer_currency_format(st.session_state.df_working[col])
+    return {col: formats[col] for col in columns}
+
+# ==================== CHART CACHE ====================
+
+CHART_CACHE_MAX_ENTRIES = 32
+CHART_CACHE_MAX_BYTES = 256 * 1024**2
+
+def _chart_data_nbytes(value):
+    """Approximate memory held by cached chart data: frames, arrays and containers of them"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(_chart_data_nbytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_chart_data_nbytes(item) for item in value)
+    return 0
+
+def get_chart_data(kind, params, build):
+    """Return the data behind a chart of df_working, calling build() only on a miss
+    
+    Entries are keyed on the data version, chart kind and chart parameters
+    and kept in an LRU bounded by entry count and bytes; bump_data_version
+    clears it.
+    """
+    cache = st.session_state.chart_cache
+    key = (st.session_state.data_version, kind, params)
+    if key in cache:
+        return lru_get(cache, key)
+    value = build()
+    return lru_put(
+        cache, key, value, max_entries=CHART_CACHE_MAX_ENTRIES,
+        max_bytes=CHART_CACHE_MAX_BYTES, nbytes=_chart_data_nbytes(value)
+    )
+
+# ==================== DISK-BACKED WORKING DATA ====================
+
+def _column_store_token(directory):
+    """A token that deletes `directory` once it is garbage collected, e.g. when its session expires"""
+    def token():
+        return directory
+    weakref.finalize(token, shutil.rmtree, directory, ignore_errors=True)
+    return token
+
+def back_with_disk(df, columns=None):
+    """Keep df_working's columns in memory-mapped files when disk-backed mode is on
+    
+    Only `columns` (all when None) and columns new to the frame are written;
+    the rest keep their existing files.
+    """
+    if not st.session_state.get('disk_backed'):
+        return df
+    if st.session_state.column_store_dir is None:
+        st.session_state.column_store_dir = tempfile.mkdtemp(prefix='data_cleaner_')
+        st.session_state.column_store_token = _column_store_token(st.session_state.column_store_dir)
+    df, st.session_state.column_store = mmap_frame(
+        df, st.session_state.column_store_dir, st.session_state.column_store, columns
+    )
+    return df
+
+def discard_column_store():
+    """Delete every column file of the disk-backed working frame"""
+    if st.session_state.get('column_store_dir') is not None:
+        shutil.rmtree(st.session_state.column_store_dir, ignore_errors=True)
+    st.session_state.column_store = {}
+    st.session_state.column_store_dir = None
+    st.session_state.column_store_token = None
+
+def sync_working_storage():
+    """Move df_working onto disk or back into RAM after the disk-backed toggle changes"""
+    df = st.session_state.df_working
+    if df is None:
+        return
+    if st.session_state.get('disk_backed') and not st.session_state.column_store:
+        st.session_state.df_working = back_with_disk(df)
+    elif not st.session_state.get('disk_backed') and st.session_state.column_store:
+        st.session_state.df_working = df.copy()
+        discard_column_store()
+
+# ==================== LAZY EXPORTS ====================
+
+EXPORT_FORMATS = {
+    'csv': {'name': 'CSV', 'icon': '📄', 'extension': 'csv', 'mime': 'text/csv',
+            'builder': export_csv, 'progress': True, 'suffixes': CSV_COMPRESSIONS},
+    'excel': {'name': 'Excel', 'icon': '📊', 'extension': 'xlsx',
+              'mime': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+              'builder': export_excel, 'progress': True},
+    'json': {'name': 'JSON', 'icon': '🔧', 'extension': 'json', 'mime': 'application/json',
+             'builder': export_json},
+    'ndjson': {'name': 'NDJSON', 'icon': '🧾', 'extension': 'ndjson', 'mime': 'application/x-ndjson',
+               'builder': export_ndjson, 'progress': True},
+    'parquet': {'name': 'Parquet', 'icon': '🧱', 'extension': 'parquet',
+                'mime': 'application/vnd.apache.parquet', 'builder': export_parquet},
+    'feather': {'name': 'Feather', 'icon': '🪶', 'extension': 'feather',
+                'mime': 'application/vnd.apache.arrow.file', 'builder': export_feather}
+}
+
+def export_options(export_format):
+    """Writer options chosen in the export tab for a format"""
+    if export_format == 'csv':
+        return {'compression': st.session_state.get('export_csv_compression', 'none')}
+    if export_format == 'parquet':
+        return {
+            'compression': st.session_state.get('export_parquet_compression', PARQUET_COMPRESSIONS[0]),
+            'row_group_size': int(st.session_state.get('export_parquet_row_group_size', PARQUET_ROW_GROUP_SIZE))
+        }
+    if export_format == 'feather':
+        return {'compression': st.session_state.get('export_feather_compression', FEATHER_COMPRESSIONS[0])}
+    return {}
+
+def get_export(export_format, build=False, progress_callback=None):
+    """Return export bytes for the current data version, generating them only when asked
+    
+    bump_data_version clears the cache, so at most one version's files are
+    held in memory.
+    """
+    cache = st.session_state.export_cache
+    options = export_options(export_format)
+    key = (export_format, st.session_state.data_version, tuple(sorted(options.items())))
+    if key not in cache and build:
+        if progress_callback is not None:
+            options['progress_callback'] = progress_callback
+        cache[key] = EXPORT_FORMATS[export_format]['builder'](st.session_state.df_working, **options)
+    return cache.get(key)
+
+# ==================== UNDO / REDO HISTORY ====================
+
+HISTORY_MAX_STEPS = 50
+HISTORY_MAX_BYTES = 512 * 1024**2
+
+def history_entry(label, df, columns=(), keep=None, dropped=(), renamed=None):
+    """Snapshot what an operation is about to change, before it runs
+    
+    Only the affected parts are stored: the old values of changed columns,
+    the rows a row filter removes, dropped columns with their positions and
+    the inverse of a rename. Each change is stored as the step that undoes it.
+    """
+    changes = []
+    if columns:
+        changes.append(('set_columns', {col: df[col].copy() for col in columns}))
+    if keep is not None:
+        keep = np.asarray(keep, dtype=bool)
+        changes.append(('insert_rows', keep, df[~keep]))
+    if dropped:
+        changes.append(('insert_columns', [(df.columns.get_loc(col), col, df[col].copy()) for col in dropped]))
+    if renamed:
+        changes.append(('rename', {new: old for old, new in renamed.items()}))
+    
+    return {
+        'label': label,
+        'changes': changes,
+        'column_types': dict(st.session_state.column_types),
+        'nbytes': _changes_nbytes(changes)
+    }
+
+def _changes_nbytes(changes):
+    """Approximate memory held by a list of history changes"""
+    total = 0
+    for change in changes:
+        if change[0] == 'set_columns':
+            total += sum(series.memory_usage(deep=True) for series in change[1].values())
+        elif change[0] == 'insert_rows':
+            total += change[1].nbytes + change[2].memory_usage(deep=True).sum()
+        elif change[0] == 'insert_columns':
+            total += sum(series.memory_usage(deep=True) for _, _, series in change[1])
+    return int(total)
+
+def push_history(entry):
+    """Record a completed operation, dropping the redo stack and the oldest steps past the caps"""
+    undo_stack = st.session_state.undo_stack
+    undo_stack.append(entry)
+    st.session_state.redo_stack = []
+    while len(undo_stack) > 1 and (
+        len(undo_stack) > HISTORY_MAX_STEPS
+        or sum(item['nbytes'] for item in undo_stack) > HISTORY_MAX_BYTES
+    ):
+        undo_stack.pop(0)
+
+def _apply_change(df, change):
+    """Apply one history change and return the new frame plus the change that reverses it"""
+    kind = change[0]
+    if kind == 'set_columns':
+        inverse = {col: df[col] for col in change[1]}
+        df = df.copy(deep=False)
+        for col, series in change[1].items():
+            df[col] = series.array
+        return df, ('set_columns', inverse)
+    
+    if kind == 'insert_rows':
+        _, keep, removed = change
+        # Put every row back at its original position, even with a non-unique index
+        order = np.empty(len(keep), dtype=np.int64)
+        order[keep] = np.arange(keep.sum())
+        order[~keep] = keep.sum() + np.arange((~keep).sum())
+        return pd.concat([df, removed]).iloc[order], ('filter_rows', keep)
+    
+    if kind == 'filter_rows':
+        keep = change[1]
+        return df[keep], ('insert_rows', keep, df[~keep])
+    
+    if kind == 'insert_columns':
+        df = df.copy(deep=False)
+        for position, col, series in sorted(change[1], key=lambda item: item[0]):
+            df.insert(min(position, len(df.columns)), col, series.array)
+        return df, ('drop_columns', [col for _, col, _ in change[1]])
+    
+    if kind == 'drop_columns':
+        inverse = [(df.columns.get_loc(col), col, df[col]) for col in change[1]]
+        return df.drop(columns=change[1]), ('insert_columns', inverse)
+    
+    # rename
+    return df.rename(columns=change[1]), ('rename', {new: old for old, new in change[1].items()})
+
+def _step_history(source_key, target_key, verb):
+    """Pop an entry from one stack, apply it to df_working and push its inverse onto the other"""
+    entry = st.session_state[source_key].pop()
+    df = st.session_state.df_working
+    
+    inverse_changes = []
+    touched = set()
+    keep = None
+    for change in reversed(entry['changes']):
+        if change[0] == 'set_columns':
+            touched.update(change[1])
+        elif change[0] == 'insert_rows':
+            touched.update(df.columns)
+        elif change[0] == 'filter_rows':
+            keep = change[1]
+        df, inverse = _apply_change(df, change)
+        inverse_changes.insert(0, inverse)
+    
+    target_entry = {
+        'label': entry['label'],
+        'changes': inverse_changes,
+        'column_types': dict(st.session_state.column_types),
+        'nbytes': _changes_nbytes(inverse_changes)
+    }
+    if 'step' in entry:
+        target_entry['step'] = entry['step']
+        if verb == 'Undo':
+            st.session_state.recipe.pop()
+        else:
+            st.session_state.recipe.append(entry['step'])
+    st.session_state[target_key].append(target_entry)
+    st.session_state.column_types = entry['column_types']
+    
+    # Masks of renamed columns are re-keyed rather than rescanned
+    renamed = {}
+    for change in entry['changes']:
+        if change[0] == 'rename':
+            renamed.update(change[1])
+    update_working_df(df, touched_columns=[col for col in touched if col in df.columns],
+                      keep=keep, renamed=renamed)
+    log_action(f"{verb}: {entry['label']}")
+
+def undo_last_action():
+    """Revert the most recent operation on df_working"""
+    _step_history('undo_stack', 'redo_stack', 'Undo')
+
+def redo_last_action():
+    """Re-apply the most recently undone operation"""
+    _step_history('redo_stack', 'undo_stack', 'Redo')
+
+def run_cleaning_step(step):
+    """Apply a step to df_working, recording it in the history, recipe and cleaning log"""
+    df = st.session_state.df_working
+    masks = None
+    if 'column' in step and tuple(step['params'].get('tokens', ())) == missing_tokens():
+        masks = get_missing_masks(df, [step['column']])
+    
+    new_df, column_types, effects = apply_step(
+        df, step, st.session_state.column_types,
+        missing_masks=masks, map_options=profiling_options()
+    )
     
-    cleaned = cleaned.str.replace(r'[^\d.-]', '', regex=True)
-    return pd.to_numeric(cleaned, errors='coerce')
+    label = describe_step(step)
+    entry = history_entry(label, df, columns=effects['columns'], keep=effects['keep'],
+                          dropped=effects['dropped'], renamed=effects['renamed'])
+    entry['step'] = step
+    update_working_df(new_df, touched_columns=effects['columns'], keep=effects['keep'],
+                      renamed=effects['renamed'])
+    st.session_state.column_types = column_types
+    push_history(entry)
+    st.session_state.recipe.append(step)
+    
+    if effects['keep'] is not None:
+        label += f" - Affected rows: {len(df) - len(new_df)}"
+    log_action(label)
+    return effects
 
 # ==================== TAB 1: DATA UPLOAD ====================
 
+def load_dataset(uploaded_file, chunksize, max_rows, sample_pct, downcast, compact):
+    """Load an upload into a fresh session, reusing another session's parse when the file matches
+    
+    The parsed, profiled and compacted frame is shared read-only between
+    sessions through the process-wide cache; this session pins it with a
+    lease.
+    """
+    reader_options = {}
+    progress_callback = None
+    if uploaded_file.name.lower().endswith('.csv'):
+        reader_options = {
+            'chunksize': int(chunksize),
+            'max_rows': int(max_rows) or None,
+            'sample_fraction': sample_pct / 100 if sample_pct < 100 else None,
+            'downcast': downcast
+        }
+    
+    key = dataset_cache_key(uploaded_file, reader_options, compact)
+    shared = shared_cache_get(key)
+    if shared is not None:
+        log_action(f"Dataset loaded: {uploaded_file.name}")
+        log_action("Parsed dataset and column types reused from the shared cache")
+    else:
+        if reader_options:
+            load_progress = st.progress(0)
+            
+            def progress_callback(bytes_read, total_bytes, rows_read):
+                load_progress.progress(
+                    bytes_read / total_bytes if total_bytes else 1.0,
+                    text=f"Read {bytes_read / 1024**2:,.1f} of {total_bytes / 1024**2:,.1f} MB ({rows_read:,} rows)"
+                )
+        
+        df = read_table(uploaded_file, key[1], progress_callback=progress_callback, **reader_options)
+        if progress_callback is not None:
+            load_progress.empty()
+        log_action(f"Dataset loaded: {uploaded_file.name}")
+        
+        # Auto-detect column types
+        progress_bar = st.progress(0)
+        column_types = map_columns(
+            df, detect_column_type,
+            progress_callback=lambda done, total: progress_bar.progress(done / total),
+            **profiling_options()
+        )
+        progress_bar.empty()
+        log_action("Column types auto-detected")
+        
+        memory_report = None
+        if compact:
+            memory_before = df.memory_usage(deep=True).sum()
+            df = compact_dtypes(df, column_types)
+            memory_after = df.memory_usage(deep=True).sum()
+            memory_report = (memory_before, memory_after)
+            log_action(f"Compacted dtypes: {memory_before / 1024**2:.2f} MB -> {memory_after / 1024**2:.2f} MB")
+        
+        shared = shared_cache_put(
+            key, {'df': df, 'column_types': column_types, 'memory_report': memory_report,
+                  'stats': dataset_stats(df)},
+            nbytes=int(memory_report[1] if memory_report else df.memory_usage(deep=True).sum()),
+            max_bytes=SHARED_CACHE_MAX_BYTES
+        )
+    
+    dataset, lease = shared
+    df = dataset['df']
+    st.session_state.column_types = {col: dict(info) for col, info in dataset['column_types'].items()}
+    st.session_state.memory_report = dataset['memory_report']
+    st.session_state.original_stats = dataset['stats']
+    
+    # Cleaning never modifies a frame in place and pandas copy-on-write
+    # shares untouched columns, so the original costs no extra copy
+    st.session_state.original_shape = df.shape
+    st.session_state.dataset_name = uploaded_file.name
+    st.session_state.df_original = df
+    st.session_state.dataset_lease = lease
+    discard_column_store()
+    st.session_state.df_working = back_with_disk(df.copy(deep=False))
+    st.session_state.missing_masks = {}
+    bump_data_version()
+    st.session_state.undo_stack = []
+    st.session_state.redo_stack = []
+    st.session_state.recipe = []
+
 def tab_data_upload():
     """Tab for dataset upload and initial display"""
     st.markdown("### 📁 Dataset Upload & Overview")
     
     uploaded_file = st.file_uploader(
-        "Upload your dataset (CSV or Excel)",
-        type=['csv', 'xlsx', 'xls'],
+        "Upload your dataset (CSV, Excel, Parquet or Feather/Arrow)",
+        type=['csv', 'xlsx', 'xls', 'parquet', 'feather', 'arrow'],
         help="Maximum file size: 200MB"
     )
     
-    if uploaded_file is not None:
+    with st.expander("⚙️ Loading Options", expanded=False):
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            chunksize = st.number_input(
+                "Rows per chunk", min_value=1_000, value=CSV_CHUNK_ROWS, step=10_000,
+                help="Rows parsed per step; smaller chunks lower peak memory",
+                key='ingest_chunksize'
+            )
+        with col2:
+            max_rows = st.number_input(
+                "Row limit (0 = all rows)", min_value=0, value=0, step=100_000,
+                help="Stop reading once this many rows have been loaded",
+                key='ingest_max_rows'
+            )
+        with col3:
+            sample_pct = st.slider(
+                "Sample %", 1, 100, 100,
+                help="Keep a random share of rows from every chunk",
+                key='ingest_sample_pct'
+            )
+        with col4:
+            downcast = st.checkbox(
+                "Downcast numeric types", value=True,
+                help="Store numbers in the smallest dtype that fits",
+                key='ingest_downcast'
+            )
+        compact = st.checkbox(
+            "Compact dtypes after loading", value=True,
+            help="Store categorical text as category, yes/no text as bool, text as Arrow strings and "
+                 "downcast numbers (any file type)",
+            key='ingest_compact'
+        )
+    
+    # The uploader is empty when the section was not drawn for a while, but the dataset stays loaded
+    if uploaded_file is not None or st.session_state.original_shape is not None:
         try:
             with st.spinner("Loading dataset..."):
-                if uploaded_file.name.endswith('.csv'):
-                    df = pd.read_csv(uploaded_file)
-                else:
-                    df = pd.read_excel(uploaded_file)
-                
-                if st.session_state.df_original is None:
-                    st.session_state.df_original = df.copy()
-                    st.session_state.df_working = df.copy()
-                    log_action(f"Dataset loaded: {uploaded_file.name}")
-                    
-                    # Auto-detect column types
-                    st.session_state.column_types = {}
-                    progress_bar = st.progress(0)
-                    for idx, col in enumerate(df.columns):
-                        st.session_state.column_types[col] = detect_column_type(df[col])
-                        progress_bar.progress((idx + 1) / len(df.columns))
-                    progress_bar.empty()
-                    log_action("Column types auto-detected")
+                if st.session_state.original_shape is None:
+                    load_dataset(uploaded_file, chunksize, max_rows, sample_pct, downcast, compact)
+                df = st.session_state.df_original
+                stats = get_original_stats()
             
-            st.success(f"✅ Dataset '{uploaded_file.name}' loaded successfully!")
+            st.success(f"✅ Dataset '{st.session_state.dataset_name}' loaded successfully!")
             
             # Display metrics
             st.markdown("#### 📊 Dataset Statistics")
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
-                st.metric("📋 Total Rows", f"{df.shape[0]:,}")
+                st.metric("📋 Total Rows", f"{stats['rows']:,}")
             with col2:
-                st.metric("📊 Total Columns", f"{df.shape[1]:,}")
+                st.metric("📊 Total Columns", f"{stats['columns']:,}")
             with col3:
-                memory_mb = df.memory_usage(deep=True).sum() / 1024**2
-                st.metric("💾 Memory Usage", f"{memory_mb:.2f} MB")
+                if st.session_state.memory_report is not None:
+                    memory_before, memory_after = st.session_state.memory_report
+                    st.metric(
+                        "💾 Memory Usage", f"{memory_after / 1024**2:.2f} MB",
+                        delta=f"{(memory_after - memory_before) / 1024**2:.2f} MB from {memory_before / 1024**2:.2f} MB",
+                        delta_color="inverse"
+                    )
+                else:
+                    st.metric("💾 Memory Usage", f"{stats['memory'] / 1024**2:.2f} MB")
             with col4:
-                missing_total = df.isna().sum().sum()
-                st.metric("❓ Missing Values", f"{missing_total:,}")
+                st.metric("❓ Missing Values", f"{stats['missing']:,}")
             
             # Dataset preview
             st.markdown("#### 👀 Dataset Preview")
@@ -425,6 +937,7 @@ def tab_data_upload():
             
             # Column types overview
             with st.expander("🔍 Detected Column Types & Statistics", expanded=True):
+                counts = stats['per_column']
                 type_data = []
                 for col in df.columns:
                     col_type = st.session_state.column_types[col]
@@ -433,9 +946,9 @@ def tab_data_upload():
                         'Detected Type': col_type['type'],
                         'Confidence': col_type['confidence'],
                         'Data Type': str(df[col].dtype),
-                        'Non-Null': f"{df[col].notna().sum():,}",
-                        'Null': f"{df[col].isna().sum():,}",
-                        'Unique': f"{df[col].nunique():,}"
+                        'Non-Null': f"{counts.at[col, 'non_null']:,}",
+                        'Null': f"{counts.at[col, 'null']:,}",
+                        'Unique': f"{counts.at[col, 'unique']:,}"
                     })
                 
                 type_df = pd.DataFrame(type_data)
@@ -458,11 +971,20 @@ def tab_missing_values():
     
     df = st.session_state.df_working
     
+    with st.expander("⚙️ Missing Value Tokens", expanded=False):
+        st.caption(f"Always treated as missing: blanks and {', '.join(MISSING_TOKENS)}")
+        st.text_input(
+            "Additional tokens (comma-separated)",
+            placeholder="e.g. unknown, #N/A, missing",
+            help="Values are compared after trimming surrounding whitespace",
+            key='missing_extra_tokens'
+        )
+    
     # Calculate missing data summary
+    missing_masks = get_missing_masks(df)
     missing_summary = []
     for col in df.columns:
-        missing_mask = detect_missing_patterns(df[col])
-        missing_count = missing_mask.sum()
+        missing_count = missing_masks[col].sum()
         if missing_count > 0:
             missing_summary.append({
                 'Column': col,
@@ -500,7 +1022,8 @@ def tab_missing_values():
             selected_col = st.selectbox(
                 "Select column to treat",
                 [item['Column'] for item in missing_summary],
-                help="Choose the column you want to clean"
+                help="Choose the column you want to clean",
+                key='missing_column'
             )
         
         with col2:
@@ -515,7 +1038,7 @@ def tab_missing_values():
                 st.write(df[selected_col].dropna().head(5).tolist())
             with preview_col2:
                 st.write("**Missing Values Count:**")
-                st.write(detect_missing_patterns(df[selected_col]).sum())
+                st.write(missing_masks[selected_col].sum())
         
         # Method selection based on type
         method_options = {
@@ -530,49 +1053,22 @@ def tab_missing_values():
         }
         
         methods = method_options.get(col_type, ['Drop Rows', 'Drop Column'])
-        selected_method = st.selectbox("Select treatment method", methods)
+        selected_method = st.selectbox("Select treatment method", methods, key='missing_method')
         
         # Additional parameters
         constant_value = None
         if 'Constant Value' in selected_method:
-            constant_value = st.text_input("Enter constant value", key="const_val")
+            constant_value = st.text_input("Enter constant value", key='missing_constant')
         elif 'Placeholder' in selected_method:
-            constant_value = st.text_input("Enter placeholder text", value="N/A", key="placeholder")
+            constant_value = st.text_input("Enter placeholder text", value="N/A", key='missing_placeholder')
         
         col1, col2, col3 = st.columns([1, 1, 2])
         with col1:
             if st.button("✅ Apply Treatment", type="primary", use_container_width=True):
                 try:
-                    missing_mask = detect_missing_patterns(df[selected_col])
-                    rows_before = len(df)
-                    
-                    if selected_method == 'Mean':
-                        df.loc[missing_mask, selected_col] = df[selected_col].mean()
-                    elif selected_method == 'Median':
-                        df.loc[missing_mask, selected_col] = df[selected_col].median()
-                    elif selected_method == 'Mode':
-                        mode_val = df[selected_col].mode()
-                        if len(mode_val) > 0:
-                            df.loc[missing_mask, selected_col] = mode_val[0]
-                    elif selected_method == 'Constant Value':
-                        df.loc[missing_mask, selected_col] = constant_value
-                    elif selected_method == 'Forward Fill':
-                        df[selected_col] = df[selected_col].fillna(method='ffill')
-                    elif selected_method == 'Backward Fill':
-                        df[selected_col] = df[selected_col].fillna(method='bfill')
-                    elif selected_method == 'Replace with "Unknown"':
-                        df.loc[missing_mask, selected_col] = 'Unknown'
-                    elif selected_method == 'Replace with Empty String':
-                        df.loc[missing_mask, selected_col] = ''
-                    elif 'Placeholder' in selected_method:
-                        df.loc[missing_mask, selected_col] = constant_value
-                    elif selected_method == 'Drop Rows':
-                        df = df[~missing_mask]
-                    elif selected_method == 'Drop Column':
-                        df = df.drop(columns=[selected_col])
-                    
-                    st.session_state.df_working = df
-                    log_action(f"Applied {selected_method} to '{selected_col}' - Affected rows: {rows_before - len(df)}")
+                    run_cleaning_step(missing_treatment_step(
+                        selected_col, selected_method, constant_value, tokens=missing_tokens()
+                    ))
                     st.success(f"✅ Successfully applied {selected_method}!")
                     st.rerun()
                     
@@ -581,6 +1077,7 @@ def tab_missing_values():
         
         with col2:
             if st.button("🔄 Refresh Analysis", use_container_width=True):
+                st.session_state.missing_masks = {}
                 st.rerun()
     else:
         st.success(" There is no missing values detected in your dataset!")
@@ -602,15 +1099,42 @@ def tab_currency_cleaning():
     currency_cols = [col for col, info in st.session_state.column_types.items() 
                      if info['type'] == 'currency']
     
+    # Report of the last batch clean, shown until the data changes again
+    report = st.session_state.currency_report
+    if report is not None and report[0] == st.session_state.data_version:
+        st.success(f"✅ Cleaned {len(report[1])} currency columns!")
+        st.dataframe(report[1], use_container_width=True)
+        failed_total = report[1]['Parse Failures'].sum()
+        if failed_total:
+            st.warning(f"⚠️ {failed_total:,} non-missing values could not be parsed and are now empty")
+    
     if currency_cols:
         st.markdown(f"#### 🔍 Detected {len(currency_cols)} Currency Column(s)")
         
         st.info("💡 **Tip:** Currency columns contain symbols like $, €, £, or patterns like 1,000.50")
         
+        # Batch mode: every currency column in its own detected format
+        with st.expander("⚡ Clean All Currency Columns", expanded=False):
+            detected_formats = pd.DataFrame([
+                {'Column': col, 'Detected Format': CURRENCY_FORMAT_NAMES[currency_format]}
+                for col, currency_format in get_currency_formats(currency_cols).items()
+            ])
+            st.dataframe(detected_formats, use_container_width=True)
+            
+            if st.button("🧹 Clean All Currency Columns", type="primary"):
+                try:
+                    with st.spinner(f"Cleaning {len(currency_cols)} currency columns..."):
+                        effects = run_cleaning_step(make_step('clean_currency_columns', columns=currency_cols))
+                    st.session_state.currency_report = (st.session_state.data_version, effects['report'])
+                    st.rerun()
+                except Exception as e:
+                    st.error(f"❌ Error cleaning currency: {str(e)}")
+        
         selected_col = st.selectbox(
             "Select currency column to clean",
             currency_cols,
-            help="Choose which currency column to process"
+            help="Choose which currency column to process",
+            key='currency_column'
         )
         
         # Show sample data in a nice card
@@ -628,21 +1152,24 @@ def tab_currency_cleaning():
             currency_symbol = st.text_input(
                 "Currency Symbol",
                 value="$",
-                help="e.g., $, €, £, RWF"
+                help="e.g., $, €, £, RWF",
+                key='currency_symbol'
             )
         
         with col2:
             decimal_sep = st.selectbox(
                 "Decimal Separator",
                 ['.', ','],
-                help="Character used for decimals"
+                help="Character used for decimals",
+                key='currency_decimal_sep'
             )
         
         with col3:
             thousand_sep = st.selectbox(
                 "Thousand Separator",
                 [',', '.', ' ', 'None'],
-                help="Character used for thousands"
+                help="Character used for thousands",
+                key='currency_thousand_sep'
             )
         
         if thousand_sep == 'None':
@@ -663,20 +1190,14 @@ def tab_currency_cleaning():
             if st.button("🧹 Clean Currency Column", type="primary", use_container_width=True):
                 try:
                     with st.spinner("Cleaning currency data..."):
-                        original_values = df[selected_col].copy()
-                        df[selected_col] = clean_currency_column(
-                            df[selected_col],
-                            currency_symbol,
-                            decimal_sep,
-                            thousand_sep
-                        )
-                        
-                        st.session_state.df_working = df
-                        st.session_state.column_types[selected_col] = {
-                            'type': 'numerical',
-                            'confidence': 'high'
-                        }
-                        log_action(f"Cleaned currency column '{selected_col}'")
+                        original_values = df[selected_col]
+                        run_cleaning_step(make_step(
+                            'clean_currency', column=selected_col,
+                            currency_symbol=currency_symbol,
+                            decimal_sep=decimal_sep,
+                            thousand_sep=thousand_sep
+                        ))
+                        df = st.session_state.df_working
                     
                     st.success(f"✅ Successfully cleaned '{selected_col}'!")
                     
@@ -725,16 +1246,13 @@ def tab_general_cleaning():
     col1, col2, col3 = st.columns([1, 1, 2])
     
     with col1:
-        duplicate_count = df.duplicated().sum()
+        duplicate_count = get_duplicate_count()
         st.metric("Duplicate Rows Found", f"{duplicate_count:,}")
     
     with col2:
         if duplicate_count > 0:
             if st.button("🗑️ Remove Duplicates", type="primary", use_container_width=True):
-                original_len = len(df)
-                df = df.drop_duplicates()
-                st.session_state.df_working = df
-                log_action(f"Removed {duplicate_count} duplicate rows")
+                run_cleaning_step(make_step('drop_duplicates'))
                 st.success(f"✅ Removed {duplicate_count} duplicates!")
                 st.rerun()
         else:
@@ -744,7 +1262,7 @@ def tab_general_cleaning():
     
     # Section 2: Trim Whitespace
     st.markdown("#### ✂️ Trim Whitespace from Text Columns")
-    text_cols = df.select_dtypes(include=['object']).columns.tolist()
+    text_cols = df.select_dtypes(include=TEXT_DTYPES).columns.tolist()
     
     col1, col2, col3 = st.columns([1, 1, 2])
     with col1:
@@ -753,10 +1271,7 @@ def tab_general_cleaning():
     with col2:
         if text_cols:
             if st.button("✂️ Trim Whitespace", use_container_width=True):
-                for col in text_cols:
-                    df[col] = df[col].astype(str).str.strip()
-                st.session_state.df_working = df
-                log_action(f"Trimmed whitespace from {len(text_cols)} columns")
+                run_cleaning_step(make_step('trim_whitespace', columns=text_cols))
                 st.success(f"✅ Trimmed {len(text_cols)} columns!")
                 st.rerun()
     
@@ -768,10 +1283,10 @@ def tab_general_cleaning():
         col1, col2, col3 = st.columns([2, 2, 1])
         
         with col1:
-            old_name = st.selectbox("Select column", df.columns, key='rename_old')
+            old_name = st.selectbox("Select column", df.columns, key='general_rename_old')
         
         with col2:
-            new_name = st.text_input("New name", value=old_name, key='rename_new')
+            new_name = st.text_input("New name", value=old_name, key='general_rename_new')
         
         with col3:
             st.write("")
@@ -779,11 +1294,7 @@ def tab_general_cleaning():
             if st.button("Rename", use_container_width=True):
                 if new_name and new_name != old_name:
                     if new_name not in df.columns:
-                        df = df.rename(columns={old_name: new_name})
-                        st.session_state.df_working = df
-                        if old_name in st.session_state.column_types:
-                            st.session_state.column_types[new_name] = st.session_state.column_types.pop(old_name)
-                        log_action(f"Renamed '{old_name}' to '{new_name}'")
+                        run_cleaning_step(make_step('rename_column', column=old_name, new_name=new_name))
                         st.success("✅ Column renamed!")
                         st.rerun()
                     else:
@@ -795,14 +1306,15 @@ def tab_general_cleaning():
         col1, col2, col3 = st.columns([2, 2, 1])
         
         with col1:
-            col_to_convert = st.selectbox("Select column", df.columns, key='convert_col')
+            col_to_convert = st.selectbox("Select column", df.columns, key='general_convert_col')
         
         with col2:
             current_type = str(df[col_to_convert].dtype)
             st.info(f"Current: **{current_type}**")
             new_dtype = st.selectbox(
                 "New data type",
-                ['int', 'float', 'str', 'datetime', 'category']
+                ['int', 'float', 'str', 'datetime', 'category'],
+                key='general_convert_dtype'
             )
         
         with col3:
@@ -810,13 +1322,7 @@ def tab_general_cleaning():
             st.write("")
             if st.button("Convert", use_container_width=True):
                 try:
-                    if new_dtype == 'datetime':
-                        df[col_to_convert] = pd.to_datetime(df[col_to_convert])
-                    else:
-                        df[col_to_convert] = df[col_to_convert].astype(new_dtype)
-                    
-                    st.session_state.df_working = df
-                    log_action(f"Converted '{col_to_convert}' to {new_dtype}")
+                    run_cleaning_step(make_step('convert_type', column=col_to_convert, dtype=new_dtype))
                     st.success("✅ Type converted!")
                     st.rerun()
                 except Exception as e:
@@ -828,31 +1334,28 @@ def tab_general_cleaning():
         col1, col2 = st.columns([3, 1])
         
         with col1:
-            col_to_drop = st.selectbox("Select column to drop", df.columns, key='drop_col')
+            col_to_drop = st.selectbox("Select column to drop", df.columns, key='general_drop_col')
             st.warning(f"⚠️ This will permanently remove the '{col_to_drop}' column")
         
         with col2:
             st.write("")
             st.write("")
             if st.button("🗑️ Drop Column", type="primary", use_container_width=True):
-                df = df.drop(columns=[col_to_drop])
-                st.session_state.df_working = df
-                if col_to_drop in st.session_state.column_types:
-                    del st.session_state.column_types[col_to_drop]
-                log_action(f"Dropped column '{col_to_drop}'")
+                run_cleaning_step(make_step('drop_column', column=col_to_drop))
                 st.success("✅ Column dropped!")
                 st.rerun()
     
     # Current dataset info
     st.markdown("---")
     st.markdown("#### 📊 Current Dataset Information")
+    stats = get_working_stats()
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Rows", f"{len(df):,}")
+        st.metric("Rows", f"{stats['rows']:,}")
     with col2:
-        st.metric("Columns", f"{len(df.columns):,}")
+        st.metric("Columns", f"{stats['columns']:,}")
     with col3:
-        st.metric("Memory", f"{df.memory_usage(deep=True).sum() / 1024**2:.2f} MB")
+        st.metric("Memory", f"{stats['memory'] / 1024**2:.2f} MB")
     with col4:
         st.metric("Actions", len(st.session_state.cleaning_log))
 
@@ -876,7 +1379,8 @@ def tab_visualization():
             "📈 Select Chart Type",
             ['Histogram', 'Box Plot', 'Bar Chart', 'Scatter Plot', 
              'Line Plot', 'Correlation Heatmap', 'Pie Chart'],
-            help="Choose the type of visualization"
+            help="Choose the type of visualization",
+            key='viz_chart_type'
         )
     
     with col2:
@@ -890,57 +1394,69 @@ def tab_visualization():
         if num_cols:
             col1, col2 = st.columns([3, 1])
             with col1:
-                col = st.selectbox("Select numerical column", num_cols)
+                col = st.selectbox("Select numerical column", num_cols, key='viz_histogram_column')
             with col2:
-                bins = st.slider("Number of bins", 10, 100, 30)
+                bins = st.slider("Number of bins", 10, 100, 30, key='viz_histogram_bins')
             
-            fig = px.histogram(
-                df, x=col, nbins=bins,
-                title=f'Distribution of {col}',
-                color_discrete_sequence=['#667eea']
+            # Binned here so only the bin counts are sent to the browser
+            hist = get_chart_data('histogram', (col, bins), lambda: histogram_stats(df[col], bins))
+            edges = hist['edges']
+            fig = go.Figure(go.Bar(
+                x=(edges[:-1] + edges[1:]) / 2, y=hist['counts'], width=np.diff(edges),
+                marker_color='#667eea', name=col
+            ))
+            fig.update_layout(
+                title=f'Distribution of {col}', xaxis_title=col, yaxis_title='count',
+                bargap=0, height=500
             )
-            fig.update_layout(height=500)
             st.plotly_chart(fig, use_container_width=True)
             
             # Statistics
             col1, col2, col3, col4 = st.columns(4)
             with col1:
-                st.metric("Mean", f"{df[col].mean():.2f}")
+                st.metric("Mean", f"{hist['mean']:.2f}")
             with col2:
-                st.metric("Median", f"{df[col].median():.2f}")
+                st.metric("Median", f"{hist['median']:.2f}")
             with col3:
-                st.metric("Std Dev", f"{df[col].std():.2f}")
+                st.metric("Std Dev", f"{hist['std']:.2f}")
             with col4:
-                st.metric("Count", f"{df[col].count():,}")
+                st.metric("Count", f"{hist['count']:,}")
         else:
             st.warning("⚠️ No numerical columns available for histogram")
     
     elif chart_type == 'Box Plot':
         num_cols = df.select_dtypes(include=[np.number]).columns.tolist()
         if num_cols:
-            col = st.selectbox("Select numerical column", num_cols)
+            col = st.selectbox("Select numerical column", num_cols, key='viz_box_column')
             
-            fig = px.box(
-                df, y=col,
-                title=f'Box Plot of {col}',
-                color_discrete_sequence=['#764ba2']
-            )
-            fig.update_layout(height=500)
-            st.plotly_chart(fig, use_container_width=True)
+            box = get_chart_data('box', (col,), lambda: box_stats(df[col]))
+            if box is None:
+                st.warning(f"⚠️ '{col}' has no numeric values to plot")
+                return
             
-            # Outlier statistics
-            Q1 = df[col].quantile(0.25)
-            Q3 = df[col].quantile(0.75)
-            IQR = Q3 - Q1
-            outliers = df[(df[col] < Q1 - 1.5*IQR) | (df[col] > Q3 + 1.5*IQR)]
+            # Quartiles and whiskers are precomputed; only a sample of the outliers is drawn
+            fig = go.Figure(go.Box(
+                x=[col], q1=[box['q1']], median=[box['median']], q3=[box['q3']],
+                lowerfence=[box['lower_whisker']], upperfence=[box['upper_whisker']],
+                marker_color='#764ba2', name=col
+            ))
+            if len(box['outliers']):
+                fig.add_trace(go.Scatter(
+                    x=[col] * len(box['outliers']), y=box['outliers'], mode='markers',
+                    marker_color='#764ba2', name='Outliers'
+                ))
+            fig.update_layout(title=f'Box Plot of {col}', yaxis_title=col, showlegend=False, height=500)
+            st.plotly_chart(fig, use_container_width=True)
+            if len(box['outliers']) < box['outlier_count']:
+                st.caption(f"Showing a random sample of {len(box['outliers']):,} of {box['outlier_count']:,} outliers")
             
             col1, col2, col3 = st.columns(3)
             with col1:
-                st.metric("Q1 (25%)", f"{Q1:.2f}")
+                st.metric("Q1 (25%)", f"{box['q1']:.2f}")
             with col2:
-                st.metric("Q3 (75%)", f"{Q3:.2f}")
+                st.metric("Q3 (75%)", f"{box['q3']:.2f}")
             with col3:
-                st.metric("Outliers", len(outliers))
+                st.metric("Outliers", box['outlier_count'])
         else:
             st.warning("⚠️ No numerical columns available for box plot")
     
@@ -950,11 +1466,12 @@ def tab_visualization():
         if cat_cols:
             col1, col2 = st.columns([3, 1])
             with col1:
-                col = st.selectbox("Select categorical column", cat_cols)
+                col = st.selectbox("Select categorical column", cat_cols, key='viz_bar_column')
             with col2:
-                top_n = st.slider("Show top N", 5, 50, 20)
+                top_n = st.slider("Show top N", 5, 50, 20, key='viz_bar_top_n')
             
-            value_counts = df[col].value_counts().head(top_n)
+            # Full counts are cached, so changing top N or switching bar/pie doesn't recount
+            value_counts = get_chart_data('value_counts', (col,), lambda: df[col].value_counts()).head(top_n)
             fig = px.bar(
                 x=value_counts.index, y=value_counts.values,
                 labels={'x': col, 'y': 'Count'},
@@ -972,29 +1489,71 @@ def tab_visualization():
         if len(num_cols) >= 2:
             col1, col2 = st.columns(2)
             with col1:
-                x_col = st.selectbox("X-axis", num_cols)
+                x_col = st.selectbox("X-axis", num_cols, key='viz_scatter_x')
             with col2:
-                y_col = st.selectbox("Y-axis", [c for c in num_cols if c != x_col])
+                y_col = st.selectbox("Y-axis", [c for c in num_cols if c != x_col], key='viz_scatter_y')
             
             # Optional color by categorical
             cat_cols = [col for col in df.columns 
                        if st.session_state.column_types[col]['type'] == 'categorical']
             color_col = None
             if cat_cols:
-                use_color = st.checkbox("Color by category")
+                use_color = st.checkbox("Color by category", key='viz_scatter_use_color')
                 if use_color:
-                    color_col = st.selectbox("Select category", cat_cols)
+                    color_col = st.selectbox("Select category", cat_cols, key='viz_scatter_color')
             
-            fig = px.scatter(
-                df, x=x_col, y=y_col, color=color_col,
-                title=f'{x_col} vs {y_col}',
-                color_discrete_sequence=['#667eea']
+            col1, col2 = st.columns(2)
+            with col1:
+                render_mode = st.selectbox(
+                    "Rendering", ['Auto', 'WebGL points', 'Density heatmap'],
+                    help="Auto draws points up to the point budget and a density heatmap beyond it",
+                    key='viz_scatter_render_mode'
+                )
+            with col2:
+                point_budget = st.number_input(
+                    "Point budget", min_value=1_000, max_value=500_000, value=SCATTER_POINT_BUDGET, step=5_000,
+                    help="Most points sent to the browser; larger datasets are sampled",
+                    key='viz_scatter_point_budget'
+                )
+            
+            def scatter_data():
+                # Only the plotted columns are copied, and only a bounded number of points is kept
+                plot_df = df[[x_col, y_col] + ([color_col] if color_col else [])].dropna(subset=[x_col, y_col])
+                mode = render_mode
+                if mode == 'Auto':
+                    mode = 'WebGL points' if color_col or len(plot_df) <= point_budget else 'Density heatmap'
+                if mode == 'Density heatmap':
+                    grid = density_grid(plot_df[x_col].to_numpy(dtype=float), plot_df[y_col].to_numpy(dtype=float))
+                    return mode, len(plot_df), grid
+                return mode, len(plot_df), plot_df.iloc[sample_positions(len(plot_df), int(point_budget))]
+            
+            mode, rows, plot_data = get_chart_data(
+                'scatter', (x_col, y_col, color_col, render_mode, int(point_budget)), scatter_data
             )
+            if mode == 'Density heatmap':
+                counts, x_centers, y_centers = plot_data
+                fig = go.Figure(go.Heatmap(
+                    z=np.where(counts > 0, counts, np.nan), x=x_centers, y=y_centers,
+                    colorscale='Purples', colorbar={'title': 'Rows'}
+                ))
+                fig.update_layout(
+                    title=f'{x_col} vs {y_col} (density of {rows:,} rows)',
+                    xaxis_title=x_col, yaxis_title=y_col
+                )
+            else:
+                fig = px.scatter(
+                    plot_data, x=x_col, y=y_col, color=color_col,
+                    title=f'{x_col} vs {y_col}',
+                    color_discrete_sequence=['#667eea'],
+                    render_mode='webgl'
+                )
+                if len(plot_data) < rows:
+                    st.caption(f"Showing a random sample of {len(plot_data):,} of {rows:,} points")
             fig.update_layout(height=500)
             st.plotly_chart(fig, use_container_width=True)
             
-            # Correlation
-            corr = df[[x_col, y_col]].corr().iloc[0, 1]
+            # Correlation is exact, computed on every row rather than the drawn points
+            corr = get_chart_data('pair_correlation', (x_col, y_col), lambda: df[x_col].corr(df[y_col]))
             st.metric("Correlation", f"{corr:.3f}")
         else:
             st.warning("⚠️ Need at least 2 numerical columns for scatter plot")
@@ -1002,31 +1561,86 @@ def tab_visualization():
     elif chart_type == 'Line Plot':
         num_cols = df.select_dtypes(include=[np.number]).columns.tolist()
         if num_cols:
-            col = st.selectbox("Select Y-axis column", num_cols)
+            col1, col2, col3 = st.columns([2, 1, 1])
+            with col1:
+                col = st.selectbox("Select Y-axis column", num_cols, key='viz_line_column')
+            with col2:
+                method = st.selectbox(
+                    "Downsampling", ['LTTB', 'Min-Max'],
+                    help="LTTB keeps the visual shape; Min-Max keeps every bucket's extremes",
+                    key='viz_line_downsampling'
+                )
+            with col3:
+                point_budget = st.number_input(
+                    "Point budget", min_value=500, max_value=100_000, value=LINE_POINT_BUDGET, step=500,
+                    key='viz_line_point_budget'
+                )
             
+            def line_data():
+                series = df[col].dropna()
+                x = series.index.to_numpy() if pd.api.types.is_numeric_dtype(series.index) else np.arange(len(series))
+                y = series.to_numpy(dtype=float)
+                positions = downsample_line(x, y, int(point_budget), method='lttb' if method == 'LTTB' else 'minmax')
+                return x[positions], y[positions], len(series)
+            
+            x, y, rows = get_chart_data('line', (col, method, int(point_budget)), line_data)
             fig = px.line(
-                df.reset_index(), x='index', y=col,
+                x=x, y=y,
+                labels={'x': 'index', 'y': col},
                 title=f'Line Plot of {col}',
                 color_discrete_sequence=['#667eea']
             )
             fig.update_layout(height=500)
             st.plotly_chart(fig, use_container_width=True)
+            if len(x) < rows:
+                st.caption(f"Showing {len(x):,} of {rows:,} points ({method} downsampling)")
         else:
             st.warning("⚠️ No numerical columns available for line plot")
     
     elif chart_type == 'Correlation Heatmap':
         num_cols = df.select_dtypes(include=[np.number]).columns.tolist()
         if len(num_cols) >= 2:
-            corr = df[num_cols].corr()
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                preview = st.checkbox(
+                    "Fast preview", value=len(df) > CORRELATION_SAMPLE_ROWS,
+                    help=f"Estimate correlations from a random sample of {CORRELATION_SAMPLE_ROWS:,} rows",
+                    key='viz_correlation_preview'
+                )
+            with col2:
+                ordering = st.selectbox(
+                    "Column order", ['Original', 'Clustered'],
+                    help="Clustered places strongly correlated columns next to each other",
+                    key='viz_correlation_order'
+                )
+            with col3:
+                top_k = st.number_input("Strongest pairs", min_value=1, max_value=500, value=20, key='viz_correlation_top_k')
+            
+            sample_rows = CORRELATION_SAMPLE_ROWS if preview else None
+            params = (tuple(num_cols), sample_rows)
+            matrix = get_chart_data('correlation', params, lambda: correlation_matrix(df[num_cols], sample_rows))
+            pairs = get_chart_data('correlation_pairs', params, lambda: top_correlations(matrix, 500))
+            corr = matrix
+            if ordering == 'Clustered':
+                order = get_chart_data('correlation_order', params, lambda: clustered_order(matrix))
+                corr = matrix.loc[order, order]
+            
+            # Cell labels are only readable, and cheap to send, on small matrices
             fig = px.imshow(
                 corr,
-                text_auto='.2f',
+                text_auto='.2f' if len(num_cols) <= CORRELATION_ANNOTATE_MAX else False,
                 aspect="auto",
                 title='Correlation Heatmap',
-                color_continuous_scale='RdBu_r'
+                color_continuous_scale='RdBu_r',
+                zmin=-1, zmax=1
             )
             fig.update_layout(height=600)
             st.plotly_chart(fig, use_container_width=True)
+            if preview and len(df) > CORRELATION_SAMPLE_ROWS:
+                st.caption(f"Estimated from a random sample of {CORRELATION_SAMPLE_ROWS:,} of {len(df):,} rows")
+            
+            st.markdown("#### 🔗 Strongest Correlations")
+            st.dataframe(pairs.head(int(top_k)), use_container_width=True)
         else:
             st.warning("⚠️ Need at least 2 numerical columns for correlation heatmap")
     
@@ -1036,11 +1650,12 @@ def tab_visualization():
         if cat_cols:
             col1, col2 = st.columns([3, 1])
             with col1:
-                col = st.selectbox("Select categorical column", cat_cols)
+                col = st.selectbox("Select categorical column", cat_cols, key='viz_pie_column')
             with col2:
-                top_n = st.slider("Show top N", 3, 15, 8)
+                top_n = st.slider("Show top N", 3, 15, 8, key='viz_pie_top_n')
             
-            value_counts = df[col].value_counts().head(top_n)
+            # Full counts are cached, so changing top N or switching bar/pie doesn't recount
+            value_counts = get_chart_data('value_counts', (col,), lambda: df[col].value_counts()).head(top_n)
             fig = px.pie(
                 values=value_counts.values,
                 names=value_counts.index,
@@ -1067,15 +1682,17 @@ def tab_export():
     st.markdown("#### 📊 Cleaning Summary")
     col1, col2, col3, col4 = st.columns(4)
     
+    original_rows, original_cols = st.session_state.original_shape or st.session_state.df_original.shape
+    
     with col1:
         st.metric(
             "Original Rows",
-            f"{len(st.session_state.df_original):,}",
+            f"{original_rows:,}",
             delta=None
         )
     
     with col2:
-        row_diff = len(st.session_state.df_original) - len(df)
+        row_diff = original_rows - len(df)
         st.metric(
             "Current Rows",
             f"{len(df):,}",
@@ -1083,7 +1700,7 @@ def tab_export():
         )
     
     with col3:
-        col_diff = len(st.session_state.df_original.columns) - len(df.columns)
+        col_diff = original_cols - len(df.columns)
         st.metric(
             "Current Columns",
             f"{len(df.columns):,}",
@@ -1101,46 +1718,69 @@ def tab_export():
     
     st.markdown("---")
     
-    # Download options
+    # Download options - files are only generated when requested
     st.markdown("#### 📥 Download Options")
     
-    col1, col2, col3 = st.columns(3)
+    with st.expander("⚙️ Export Options", expanded=False):
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.selectbox(
+                "CSV compression", list(CSV_COMPRESSIONS),
+                help="Compressed CSVs are written chunk by chunk as .csv.gz / .csv.zst",
+                key='export_csv_compression'
+            )
+        with col2:
+            st.selectbox("Parquet compression", PARQUET_COMPRESSIONS, key='export_parquet_compression')
+        with col3:
+            st.number_input(
+                "Parquet rows per row group", min_value=1_000, value=PARQUET_ROW_GROUP_SIZE, step=10_000,
+                help="Smaller row groups let readers skip more data; larger ones compress better",
+                key='export_parquet_row_group_size'
+            )
+        with col4:
+            st.selectbox("Feather compression", FEATHER_COMPRESSIONS, key='export_feather_compression')
     
-    with col1:
-        # CSV download
-        csv = df.to_csv(index=False).encode('utf-8')
-        st.download_button(
-            label="📄 Download as CSV",
-            data=csv,
-            file_name=f"cleaned_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv",
-            use_container_width=True
-        )
+    export_formats = list(EXPORT_FORMATS)
+    for start in range(0, len(export_formats), 3):
+        for column, export_format in zip(st.columns(3), export_formats[start:start + 3]):
+            with column:
+                render_export_option(export_format)
     
-    with col2:
-        # Excel download
-        buffer = BytesIO()
-        with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Cleaned Data')
-        
-        st.download_button(
-            label="📊 Download as Excel",
-            data=buffer.getvalue(),
-            file_name=f"cleaned_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            use_container_width=True
-        )
+    st.markdown("---")
     
-    with col3:
-        # JSON download
-        json_str = df.to_json(orient='records', indent=2)
+    # Cleaning recipe
+    st.markdown("#### 📜 Cleaning Recipe")
+    if st.session_state.recipe:
+        recipe_df = pd.DataFrame([
+            {'Step': number, 'Operation': describe_step(step),
+             'Parameters': json.dumps(step['params'], default=str)}
+            for number, step in enumerate(st.session_state.recipe, 1)
+        ])
+        st.dataframe(recipe_df, use_container_width=True, hide_index=True)
         st.download_button(
-            label="🔧 Download as JSON",
-            data=json_str,
-            file_name=f"cleaned_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-            mime="application/json",
-            use_container_width=True
+            label="📥 Download Recipe",
+            data=recipe_to_json(st.session_state.recipe),
+            file_name=f"cleaning_recipe_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            mime="application/json"
         )
+    else:
+        st.info("ℹ️ Cleaning actions you apply are recorded here as a replayable recipe")
+    
+    with st.expander("▶️ Replay a Saved Recipe", expanded=False):
+        recipe_file = st.file_uploader("Upload a recipe (JSON)", type=['json'], key='recipe_upload')
+        if recipe_file is not None and st.button("▶️ Apply Recipe to Current Dataset"):
+            try:
+                steps = load_recipe(recipe_file.getvalue())
+                with st.spinner(f"Replaying {len(steps)} steps..."):
+                    for number, step in enumerate(steps, 1):
+                        try:
+                            run_cleaning_step(step)
+                        except Exception as e:
+                            raise ValueError(f"Step {number} ({describe_step(step)}) failed: {e}") from e
+                st.success(f"✅ Replayed {len(steps)} steps!")
+                st.rerun()
+            except Exception as e:
+                st.error(f"❌ Error replaying recipe: {str(e)}")
     
     st.markdown("---")
     
@@ -1162,10 +1802,94 @@ def tab_export():
     else:
         st.info("ℹ️ No cleaning actions performed yet")
 
+def render_export_option(export_format):
+    """Show a prepare button for an export format, then its download button once built"""
+    spec = EXPORT_FORMATS[export_format]
+    data = get_export(export_format)
+    if data is None and st.button(f"⚙️ Prepare {spec['name']}", key=f"prepare_{export_format}",
+                                  use_container_width=True):
+        try:
+            progress_callback = None
+            if spec.get('progress'):
+                export_progress = st.progress(0)
+                
+                def progress_callback(rows_written, total_rows):
+                    export_progress.progress(
+                        rows_written / total_rows if total_rows else 1.0,
+                        text=f"Wrote {rows_written:,} of {total_rows:,} rows"
+                    )
+            
+            with st.spinner(f"Generating {spec['name']}..."):
+                data = get_export(export_format, build=True, progress_callback=progress_callback)
+            if progress_callback is not None:
+                export_progress.empty()
+        except Exception as e:
+            st.error(f"❌ Error generating {spec['name']}: {str(e)}")
+    
+    if data is not None:
+        suffix = spec.get('suffixes', {}).get(export_options(export_format).get('compression'), '')
+        st.download_button(
+            label=f"{spec['icon']} Download as {spec['name']}",
+            data=data,
+            file_name=f"cleaned_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{spec['extension']}{suffix}",
+            mime=spec['mime'],
+            use_container_width=True,
+            key=f"download_{export_format}"
+        )
+
+# ==================== NAVIGATION ====================
+
+SECTIONS = {
+    "📁 Data Upload": tab_data_upload,
+    "🔍 Missing Values": tab_missing_values,
+    "💰 Currency Cleaning": tab_currency_cleaning,
+    "🧹 General Cleaning": tab_general_cleaning,
+    "📊 Visualization": tab_visualization,
+    "💾 Export": tab_export
+}
+
+# Every value widget of a section is keyed with its prefix. Buttons and file
+# uploaders must not use these prefixes, since their values can't be set.
+SECTION_KEY_PREFIXES = {
+    "📁 Data Upload": 'ingest_',
+    "🔍 Missing Values": 'missing_',
+    "💰 Currency Cleaning": 'currency_',
+    "🧹 General Cleaning": 'general_',
+    "📊 Visualization": 'viz_',
+    "💾 Export": 'export_'
+}
+
+def preserve_hidden_sections(active):
+    """Keep the widget values of sections that are not drawn this run
+    
+    Streamlit forgets a widget's value after a run that doesn't draw it;
+    writing the value back to session state keeps it until the section is
+    shown again.
+    """
+    hidden = tuple(prefix for label, prefix in SECTION_KEY_PREFIXES.items() if label != active)
+    for key in list(st.session_state.keys()):
+        if key.startswith(hidden):
+            st.session_state[key] = st.session_state[key]
+
+def render_section(label):
+    """Run one section's tab function and return how long it took in seconds"""
+    started = time.perf_counter()
+    SECTIONS[label]()
+    return time.perf_counter() - started
+
+def show_section_timings(slot, timings):
+    """Fill the sidebar slot with this run's render time of every section"""
+    lines = [
+        f"{label}: {timings[label] * 1000:,.0f} ms" if label in timings else f"{label}: not run"
+        for label in SECTIONS
+    ]
+    slot.caption("⏱️ Section render times (this run)  \n" + "  \n".join(lines))
+
 # ==================== MAIN APPLICATION ====================
 
 def main():
     """Main application logic"""
+    configure_page()
     load_custom_css()
     initialize_session_state()
     
@@ -1202,9 +1926,56 @@ def main():
             </div>
             """, unsafe_allow_html=True)
             
+            st.markdown("### ↩️ History")
+            col1, col2 = st.columns(2)
+            with col1:
+                if st.button("↩️ Undo", disabled=not st.session_state.undo_stack, use_container_width=True):
+                    undo_last_action()
+                    st.rerun()
+            with col2:
+                if st.button("↪️ Redo", disabled=not st.session_state.redo_stack, use_container_width=True):
+                    redo_last_action()
+                    st.rerun()
+            if st.session_state.undo_stack:
+                st.caption(f"Last action: {st.session_state.undo_stack[-1]['label']}")
+            
             st.markdown("---")
         
+        st.markdown("### ⚙️ Performance")
+        st.number_input(
+            "Profiling workers", min_value=1, max_value=os.cpu_count() or 1,
+            help="Columns profiled in parallel; 1 runs everything serially",
+            key='profile_workers'
+        )
+        st.selectbox(
+            "Profiling backend", ['thread', 'process', 'serial'],
+            help="Threads avoid process start-up and copying text columns; processes use every "
+                 "core but share only numeric columns without copying",
+            key='profile_backend'
+        )
+        cache_stats = shared_cache_stats()
+        st.caption(
+            f"Shared dataset cache: {cache_stats['entries']} datasets "
+            f"({cache_stats['pinned']} in use), {cache_stats['nbytes'] / 1024**2:,.1f} MB"
+        )
+        st.checkbox(
+            "Disk-backed working data", value=False,
+            help="Write the cleaned working copy's columns to memory-mapped files so edits "
+                 "don't add to RAM; the uploaded dataset itself stays in memory",
+            key='disk_backed'
+        )
+        sync_working_storage()
+        st.checkbox(
+            "Render only the active section", value=True,
+            help="Run just the selected section on each interaction instead of all six tabs",
+            key='lazy_sections'
+        )
+        timing_slot = st.empty()
+        
+        st.markdown("---")
+        
         if st.button("🔄 Reset Everything", use_container_width=True):
+            discard_column_store()
             for key in list(st.session_state.keys()):
                 del st.session_state[key]
             st.rerun()
@@ -1221,33 +1992,18 @@ def main():
     st.markdown("<h1 style='text-align: center;'>Richard Data Cleaning & Visualization System</h1>", unsafe_allow_html=True)
     st.markdown("<p style='text-align: center; font-size: 1.2rem; color: #4a5568; margin-bottom: 2rem;'>Professional tool for automated data cleaning and exploration</p>", unsafe_allow_html=True)
     
-    # Tabs
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-        "📁 Data Upload",
-        "🔍 Missing Values",
-        "💰 Currency Cleaning",
-        "🧹 General Cleaning",
-        "📊 Visualization",
-        "💾 Export"
-    ])
-    
-    with tab1:
-        tab_data_upload()
-    
-    with tab2:
-        tab_missing_values()
-    
-    with tab3:
-        tab_currency_cleaning()
-    
-    with tab4:
-        tab_general_cleaning()
-    
-    with tab5:
-        tab_visualization()
-    
-    with tab6:
-        tab_export()
+    # Sections: either only the selected one runs, or all six as tabs
+    timings = {}
+    if st.session_state.lazy_sections:
+        active = st.radio("Section", list(SECTIONS), horizontal=True, label_visibility='collapsed',
+                          key='active_section')
+        preserve_hidden_sections(active)
+        timings[active] = render_section(active)
+    else:
+        for tab, label in zip(st.tabs(list(SECTIONS)), SECTIONS):
+            with tab:
+                timings[label] = render_section(label)
+    show_section_timings(timing_slot, timings)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
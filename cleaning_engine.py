@@ -0,0 +1,1215 @@
+"""Streamlit-free cleaning engine shared by the web app and the command-line runner"""
+import pandas as pd
+import numpy as np
+from io import BytesIO
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from multiprocessing.shared_memory import SharedMemory
+from pandas.tseries.api import guess_datetime_format
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+import weakref
+
+# ==================== CACHING HELPERS ====================
+
+def lru_get(cache, key):
+    """Return a cached value and mark it most recently used, or None on a miss"""
+    if key not in cache:
+        return None
+    cache.move_to_end(key)
+    return cache[key][0]
+
+def lru_put(cache, key, value, max_entries, max_bytes=None, nbytes=0):
+    """Store a value in an LRU cache, evicting the oldest entries past the limits"""
+    cache[key] = (value, nbytes)
+    cache.move_to_end(key)
+    
+    # Never evict the entry that was just stored
+    while len(cache) > 1:
+        total_bytes = sum(size for _, size in cache.values())
+        if len(cache) <= max_entries and (max_bytes is None or total_bytes <= max_bytes):
+            break
+        cache.popitem(last=False)
+    return value
+
+# ==================== SHARED DATASET CACHE ====================
+
+# Process-wide, so every session of a server sees the same entries
+_shared_cache = OrderedDict()
+_shared_cache_lock = threading.Lock()
+_pending_releases = deque()
+
+def _release_shared(key):
+    """Queue one reference to a shared entry for release
+    
+    This runs from a garbage-collection finalizer, which can fire while this
+    thread already holds the cache lock, so it never takes the lock itself;
+    the next cache call applies the release.
+    """
+    _pending_releases.append(key)
+
+def _apply_releases():
+    """Drop the references queued by finalizers; the cache lock must be held"""
+    while _pending_releases:
+        key = _pending_releases.popleft()
+        if key in _shared_cache:
+            _shared_cache[key]['refs'] -= 1
+
+def _new_lease(key):
+    """A token that pins a shared entry until it is garbage collected; calling it returns the key"""
+    def lease():
+        return key
+    weakref.finalize(lease, _release_shared, key)
+    return lease
+
+def shared_cache_get(key):
+    """Return (value, lease) for a shared entry, or None on a miss"""
+    with _shared_cache_lock:
+        _apply_releases()
+        if key not in _shared_cache:
+            return None
+        _shared_cache.move_to_end(key)
+        entry = _shared_cache[key]
+        entry['refs'] += 1
+    return entry['value'], _new_lease(key)
+
+def shared_cache_put(key, value, nbytes, max_bytes):
+    """Share a value across sessions and return (value, lease)
+    
+    Least recently used entries that no lease pins are evicted until the
+    cache fits max_bytes. If another session stored the key first, its value
+    is returned instead, so both sessions hold the same object.
+    """
+    with _shared_cache_lock:
+        _apply_releases()
+        if key not in _shared_cache:
+            _shared_cache[key] = {'value': value, 'nbytes': nbytes, 'refs': 0}
+        _shared_cache.move_to_end(key)
+        entry = _shared_cache[key]
+        entry['refs'] += 1
+        
+        total_bytes = sum(cached['nbytes'] for cached in _shared_cache.values())
+        for other in list(_shared_cache):
+            if total_bytes <= max_bytes:
+                break
+            if other != key and _shared_cache[other]['refs'] <= 0:
+                total_bytes -= _shared_cache.pop(other)['nbytes']
+    return entry['value'], _new_lease(key)
+
+def shared_cache_stats():
+    """Entry count, total bytes and pinned entry count of the shared cache"""
+    with _shared_cache_lock:
+        _apply_releases()
+        entries = list(_shared_cache.values())
+    return {
+        'entries': len(entries),
+        'nbytes': sum(entry['nbytes'] for entry in entries),
+        'pinned': sum(1 for entry in entries if entry['refs'] > 0)
+    }
+
+# ==================== DATA INGESTION ====================
+
+CSV_CHUNK_ROWS = 100_000
+SAMPLE_SEED = 42
+
+def downcast_numeric(df, floats=True):
+    """Downcast integer columns, and float columns unless floats is False, to the smallest dtype that fits"""
+    for col in df.select_dtypes(include=['integer']).columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    if floats:
+        for col in df.select_dtypes(include=['floating']).columns:
+            narrowed = pd.to_numeric(df[col], downcast='float')
+            # float32 keeps about 7 significant digits, so only columns that round-trip exactly are narrowed
+            if narrowed.dtype != df[col].dtype and np.array_equal(
+                narrowed.to_numpy(dtype='float64', na_value=np.nan),
+                df[col].to_numpy(dtype='float64', na_value=np.nan),
+                equal_nan=True
+            ):
+                df[col] = narrowed
+    return df
+
+def read_csv_chunked(file, chunksize=CSV_CHUNK_ROWS, max_rows=None, sample_fraction=None,
+                     downcast=True, progress_callback=None):
+    """Stream a CSV in chunks with optional row budget, sampling and dtype downcasting"""
+    file.seek(0, 2)
+    total_bytes = file.tell()
+    file.seek(0)
+    
+    rng = np.random.default_rng(SAMPLE_SEED)
+    chunks = []
+    rows_kept = 0
+    for chunk in pd.read_csv(file, chunksize=chunksize):
+        if sample_fraction is not None and sample_fraction < 1:
+            # Boolean mask rather than DataFrame.sample keeps the file's row order
+            chunk = chunk[rng.random(len(chunk)) < sample_fraction]
+        if max_rows is not None and rows_kept + len(chunk) > max_rows:
+            chunk = chunk.iloc[:max_rows - rows_kept]
+        if downcast:
+            # Integer downcasts are exact whatever the chunk; floats are decided once for the whole column
+            chunk = downcast_numeric(chunk, floats=False)
+        
+        chunks.append(chunk)
+        rows_kept += len(chunk)
+        if progress_callback is not None:
+            progress_callback(min(file.tell(), total_bytes), total_bytes, rows_kept)
+        if max_rows is not None and rows_kept >= max_rows:
+            break
+    
+    if not chunks:
+        file.seek(0)
+        return pd.read_csv(file)
+    df = pd.concat(chunks, ignore_index=True)
+    
+    # Each chunk infers its own dtypes, so a column can come back as numbers
+    # in one chunk and text in another; concat leaves those mixed in an
+    # object column, which a single read would have parsed as text
+    for col in df.columns:
+        if df[col].dtype == object and len({chunk[col].dtype for chunk in chunks}) > 1:
+            df[col] = df[col].astype(ARROW_STRING_DTYPE)
+    return downcast_numeric(df) if downcast else df
+
+def content_hash(file):
+    """Hash the full content of a binary file object without loading it at once"""
+    hasher = hashlib.blake2b(digest_size=16)
+    if hasattr(file, 'getbuffer'):
+        hasher.update(file.getbuffer())
+    else:
+        file.seek(0)
+        for chunk in iter(lambda: file.read(8 * 1024**2), b''):
+            hasher.update(chunk)
+        file.seek(0)
+    return hasher.hexdigest()
+
+COLUMNAR_EXTENSIONS = ('parquet', 'feather', 'arrow')
+
+def read_table(file, extension, progress_callback=None, **reader_options):
+    """Parse a CSV, Excel, Parquet or Feather/Arrow IPC file object into a frame"""
+    file.seek(0)
+    if extension == 'csv':
+        return read_csv_chunked(file, progress_callback=progress_callback, **reader_options)
+    if extension == 'parquet':
+        return pd.read_parquet(file, engine='pyarrow', **reader_options)
+    if extension in ('feather', 'arrow'):
+        return pd.read_feather(file, **reader_options)
+    return pd.read_excel(file, **reader_options)
+
+# ==================== DISK-BACKED COLUMNS ====================
+
+COLUMN_SIDECARS = ('.categories', '.mask')
+# Nullable arrays by the NumPy kind of their values
+MASKED_ARRAY_TYPES = {
+    'b': pd.arrays.BooleanArray,
+    'i': pd.arrays.IntegerArray,
+    'u': pd.arrays.IntegerArray,
+    'f': pd.arrays.FloatingArray
+}
+
+def _save_npy(values, path):
+    """Write an array to a .npy file at path"""
+    with open(path, 'wb') as file:
+        np.save(file, values)
+
+def _write_arrow(frame, path):
+    """Write a frame to an uncompressed, memory-mappable Arrow IPC file"""
+    import pyarrow as pa
+    from pyarrow import feather
+    
+    feather.write_feather(pa.Table.from_pandas(frame, preserve_index=False), path, compression='uncompressed')
+
+def write_column(series, directory):
+    """Save one column to memory-mappable files in `directory` and return the main file's path
+    
+    Plain NumPy columns go to .npy files. Categoricals keep their codes in a
+    .npy file and their categories in a small Arrow sidecar; nullable numbers
+    and booleans keep their values and missing-value mask in two .npy files.
+    Everything else, such as Arrow strings, goes to a single-column Arrow IPC
+    file. Returns None for Python-object columns, which Arrow would retype,
+    and for values Arrow cannot represent.
+    """
+    import pyarrow as pa
+    
+    if pd.api.types.is_object_dtype(series):
+        return None
+    
+    handle, path = tempfile.mkstemp(suffix='.npy', dir=directory)
+    os.close(handle)
+    try:
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biufmM':
+            _save_npy(series.to_numpy(), path)
+        elif isinstance(series.dtype, pd.CategoricalDtype):
+            _save_npy(series.cat.codes.to_numpy(), path)
+            # One row per category, stored as a categorical so the ordered flag survives
+            categories = pd.Categorical(series.cat.categories, dtype=series.dtype)
+            _write_arrow(pd.DataFrame({'values': categories}), path + '.categories')
+        elif isinstance(series.array, tuple(MASKED_ARRAY_TYPES.values())):
+            numpy_dtype = series.dtype.numpy_dtype
+            _save_npy(series.to_numpy(dtype=numpy_dtype, na_value=numpy_dtype.type(0)), path)
+            _save_npy(series.isna().to_numpy(), path + '.mask')
+        else:
+            os.remove(path)
+            path = path[:-len('.npy')] + '.arrow'
+            _write_arrow(series.to_frame('values'), path)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        _remove_column_file(path)
+        return None
+    return path
+
+def read_column(path):
+    """Map a column written by write_column back as an array without reading it into RAM
+    
+    NumPy files are mapped copy-on-write, so in-place edits never reach the file.
+    """
+    from pyarrow import feather
+    
+    if path.endswith('.arrow'):
+        return feather.read_table(path, memory_map=True).to_pandas()['values'].array
+    values = np.load(path, mmap_mode='c')
+    if os.path.exists(path + '.categories'):
+        dtype = feather.read_table(path + '.categories').to_pandas()['values'].dtype
+        return pd.Categorical.from_codes(values, dtype=dtype, validate=False)
+    if os.path.exists(path + '.mask'):
+        mask = np.load(path + '.mask', mmap_mode='c')
+        return MASKED_ARRAY_TYPES[values.dtype.kind](values, mask)
+    return values
+
+def _remove_column_file(path):
+    """Delete a column's files, leaving them to the OS if they are still mapped elsewhere"""
+    if path is not None:
+        for suffix in ('',) + COLUMN_SIDECARS:
+            try:
+                os.remove(path + suffix)
+            except OSError:
+                pass
+
+def mmap_frame(df, directory, paths=None, columns=None):
+    """Rebuild a frame over memory-mapped column files kept in `directory`
+    
+    paths maps columns to the files of an earlier call. Only `columns` (all
+    when None) and columns without a file are written again, and files of
+    columns that left the frame are deleted. Returns the new frame and the
+    updated paths.
+    """
+    paths = dict(paths or {})
+    rewrite = set(df.columns if columns is None else columns)
+    for col in [col for col in paths if col not in df.columns or col in rewrite]:
+        _remove_column_file(paths.pop(col))
+    
+    data = {}
+    for col in df.columns:
+        if col not in paths:
+            paths[col] = write_column(df[col], directory)
+        data[col] = df[col].array if paths[col] is None else read_column(paths[col])
+    return pd.DataFrame(data, index=df.index, copy=False), paths
+
+# ==================== EXPORT ====================
+
+EXPORT_CHUNK_ROWS = 50_000
+SPOOL_MAX_BYTES = 32 * 1024**2
+CSV_COMPRESSIONS = {'none': '', 'gzip': '.gz', 'zstd': '.zst'}
+
+def _frame_chunks(df):
+    """Yield (rows_through, chunk) slices of a frame; an empty frame yields one empty chunk"""
+    for start in range(0, max(len(df), 1), EXPORT_CHUNK_ROWS):
+        chunk = df.iloc[start:start + EXPORT_CHUNK_ROWS]
+        yield start + len(chunk), chunk
+
+def _spool_chunks(encoded_chunks, total_rows, compression='none', progress_callback=None):
+    """Write encoded chunks through a spooled temp file and return the finished file's bytes
+    
+    Each chunk is compressed on its own into a gzip member or zstd frame;
+    concatenated members/frames are a valid stream for both formats, so only
+    one chunk is ever held uncompressed. The spool moves to disk past
+    SPOOL_MAX_BYTES.
+    """
+    import pyarrow as pa
+    
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as spool:
+        for rows_written, data in encoded_chunks:
+            if compression != 'none':
+                data = pa.compress(data, codec=compression, asbytes=True)
+            spool.write(data)
+            if progress_callback is not None:
+                progress_callback(rows_written, total_rows)
+        spool.seek(0)
+        return spool.read()
+
+def export_csv(df, compression='none', progress_callback=None):
+    """Serialize a frame as UTF-8 CSV, optionally gzip or zstd compressed, one chunk at a time"""
+    encoded_chunks = (
+        (rows_written, chunk.to_csv(index=False, header=rows_written <= EXPORT_CHUNK_ROWS).encode('utf-8'))
+        for rows_written, chunk in _frame_chunks(df)
+    )
+    return _spool_chunks(encoded_chunks, len(df), compression, progress_callback)
+
+def export_ndjson(df, progress_callback=None):
+    """Serialize a frame as newline-delimited JSON records, one chunk at a time"""
+    encoded_chunks = (
+        (rows_written, chunk.to_json(orient='records', lines=True, date_format='iso').encode('utf-8'))
+        for rows_written, chunk in _frame_chunks(df) if len(chunk)
+    )
+    return _spool_chunks(encoded_chunks, len(df), progress_callback=progress_callback)
+
+EXCEL_MAX_ROWS = 1_048_576
+
+def _excel_rows(df):
+    """Yield frame rows as plain Python values, with missing cells as None"""
+    for _, chunk in _frame_chunks(df):
+        chunk = chunk.astype(object)
+        yield from chunk.where(chunk.notna(), None).itertuples(index=False, name=None)
+
+def export_excel(df, sheet_name='Cleaned Data', progress_callback=None):
+    """Stream a frame into an .xlsx workbook with openpyxl's write-only mode
+    
+    Rows are appended without building a cell object model, and frames longer
+    than Excel's row limit continue on numbered sheets ("Cleaned Data (2)", ...)
+    that each repeat the header. progress_callback(rows_written, total_rows)
+    is called after every chunk.
+    """
+    from openpyxl import Workbook
+    
+    rows_per_sheet = EXCEL_MAX_ROWS - 1
+    header = [str(col) for col in df.columns]
+    workbook = Workbook(write_only=True)
+    sheet = None
+    for written, row in enumerate(_excel_rows(df)):
+        if written % rows_per_sheet == 0:
+            number = written // rows_per_sheet + 1
+            sheet = workbook.create_sheet(sheet_name if number == 1 else f"{sheet_name} ({number})")
+            sheet.append(header)
+        sheet.append(row)
+        if progress_callback is not None and (written + 1) % EXPORT_CHUNK_ROWS == 0:
+            progress_callback(written + 1, len(df))
+    if sheet is None:
+        workbook.create_sheet(sheet_name).append(header)
+    if progress_callback is not None:
+        progress_callback(len(df), len(df))
+    
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+def export_json(df):
+    """Serialize a frame as a JSON array of records"""
+    return df.to_json(orient='records', indent=2).encode('utf-8')
+
+PARQUET_COMPRESSIONS = ('snappy', 'zstd', 'gzip', 'brotli', 'lz4', 'none')
+FEATHER_COMPRESSIONS = ('lz4', 'zstd', 'uncompressed')
+PARQUET_ROW_GROUP_SIZE = 100_000
+
+def export_parquet(df, compression='snappy', row_group_size=PARQUET_ROW_GROUP_SIZE):
+    """Serialize a frame as Parquet, keeping categorical, datetime and numeric dtypes"""
+    buffer = BytesIO()
+    df.to_parquet(
+        buffer, engine='pyarrow', index=False,
+        compression=None if compression == 'none' else compression,
+        row_group_size=row_group_size
+    )
+    return buffer.getvalue()
+
+def export_feather(df, compression='lz4'):
+    """Serialize a frame as a Feather v2 (Arrow IPC) file"""
+    buffer = BytesIO()
+    df.reset_index(drop=True).to_feather(buffer, compression=compression)
+    return buffer.getvalue()
+
+# ==================== COLUMN ANALYSIS ====================
+
+TYPE_SAMPLE_SIZE = 2_000
+BOOL_PATTERNS = {'true', 'false', 'yes', 'no', '1', '0', 't', 'f', 'y', 'n'}
+CURRENCY_PATTERN = re.compile(r'[$€£¥₹₽₦₨₪₫₩₴₸₵₲₱₡₪₺₼₾₿]|RWF|USD|EUR|GBP')
+DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}|\d{2}/\d{2}/\d{4}|\d{2}-\d{2}-\d{4}')
+NUMERIC_PATTERN = re.compile(r'^-?\d+\.?\d*$')
+
+def stratified_sample(series, size):
+    """Pick one random value from each of `size` equal-width strata of the series"""
+    if len(series) <= size:
+        return series
+    rng = np.random.default_rng(SAMPLE_SEED)
+    bounds = np.linspace(0, len(series), size + 1).astype(np.int64)
+    positions = bounds[:-1] + (rng.random(size) * np.diff(bounds)).astype(np.int64)
+    return series.iloc[positions]
+
+def _classify_values(values, counts, is_sample):
+    """Classify a column from its distinct values (as strings) and their counts
+    
+    Returns the type info plus what a sample verdict still needs before it can
+    be trusted: None, 'unique_ratio' (an exact distinct count) or 'values'
+    (a full-column scan).
+    """
+    escalate = 'values' if is_sample else None
+    total = counts.sum()
+    
+    # Check for boolean - a sample cannot rule out rare extra values
+    if len(values) <= 64:
+        lowered = set(values.str.lower())
+        if len(lowered) <= 2 and lowered.issubset(BOOL_PATTERNS):
+            return {'type': 'boolean', 'confidence': 'high'}, escalate
+    
+    # Check for currency/monetary
+    if values.str.contains(CURRENCY_PATTERN, na=False).any():
+        return {'type': 'currency', 'confidence': 'high'}, None
+    
+    # Check for datetime, skipping the parser when every value is a plain number
+    numeric_hits = values.str.match(NUMERIC_PATTERN, na=False)
+    if not numeric_hits.all():
+        # Passing the format pandas would infer keeps it from warning when there
+        # is none; warning filters are process-wide, so profiling threads must
+        # not change them
+        date_format = guess_datetime_format(next((value for value in values if value), '')) or 'mixed'
+        try:
+            pd.to_datetime(values, format=date_format, errors='raise')
+            return {'type': 'datetime', 'confidence': 'high'}, None
+        except (ValueError, TypeError, OverflowError):
+            if values.str.contains(DATE_PATTERN, na=False).any():
+                return {'type': 'datetime', 'confidence': 'medium'}, None
+    
+    # Check for numerical
+    numeric_match = counts[numeric_hits].sum() / total
+    if numeric_match > 0.8:
+        return {'type': 'numerical', 'confidence': 'high'}, escalate if numeric_match < 0.95 else None
+    if is_sample and numeric_match >= 0.6:
+        return {'type': 'text', 'confidence': 'medium'}, escalate
+    
+    # Check for categorical - a unique ratio cannot be estimated from a
+    # sample, so only a handful of distinct values is decisive there
+    if len(values) < 20 or (not is_sample and len(values) / total < 0.05):
+        return {'type': 'categorical', 'confidence': 'high'}, None
+    
+    return {'type': 'text', 'confidence': 'medium'}, 'unique_ratio' if is_sample else None
+
+def detect_column_type(series, sample_size=TYPE_SAMPLE_SIZE):
+    """Detect column type from a stratified sample, escalating to a full scan when ambiguous"""
+    non_null = series.dropna()
+    if len(non_null) == 0:
+        return {'type': 'empty', 'confidence': 'high'}
+    
+    # Native dtypes decide without inspecting any values as strings
+    if pd.api.types.is_bool_dtype(series):
+        return {'type': 'boolean', 'confidence': 'high'}
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return {'type': 'datetime', 'confidence': 'high'}
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return {'type': 'categorical', 'confidence': 'high'}
+    if pd.api.types.is_numeric_dtype(series):
+        if pd.api.types.is_integer_dtype(series) and non_null.isin([0, 1]).all():
+            return {'type': 'boolean', 'confidence': 'high'}
+        return {'type': 'numerical', 'confidence': 'high'}
+    
+    sample = stratified_sample(non_null, sample_size)
+    sample_counts = sample.value_counts(sort=False)
+    result, escalate = _classify_values(
+        sample_counts.index.astype(str), sample_counts.to_numpy(),
+        is_sample=len(sample) < len(non_null)
+    )
+    if escalate is None:
+        return result
+    
+    if escalate == 'unique_ratio':
+        unique_count = non_null.nunique()
+        if unique_count < 20 or unique_count / len(non_null) < 0.05:
+            return {'type': 'categorical', 'confidence': 'high'}
+        return result
+    
+    # Full scan works on distinct values, so each regex runs once per value
+    full_counts = non_null.value_counts(sort=False)
+    result, _ = _classify_values(
+        full_counts.index.astype(str), full_counts.to_numpy(), is_sample=False
+    )
+    return result
+
+MISSING_TOKENS = ('NA', 'N/A', 'na', 'n/a', 'NaN', 'nan',
+                  'NULL', 'null', 'None', 'none', '?', '-', '--', 'n.a.')
+
+def detect_missing_patterns(series, tokens=MISSING_TOKENS):
+    """Detect nulls, blanks and missing-value tokens, testing each distinct value once"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        uniques = series.cat.categories
+    elif (pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series)
+          or pd.api.types.is_datetime64_any_dtype(series)):
+        return series.isna()
+    else:
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    
+    # Values are stripped before matching, so blanks and padded tokens count too
+    token_set = {str(token).strip() for token in tokens} | {''}
+    unique_missing = pd.Index(uniques).astype(str).str.strip().isin(token_set)
+    
+    # Null values carry code -1, which picks the trailing True
+    lookup = np.append(np.asarray(unique_missing, dtype=bool), True)
+    return pd.Series(lookup[codes], index=series.index, name=series.name)
+
+def clean_currency_column(series, currency_symbol='$', decimal_sep='.', thousand_sep=','):
+    """Clean currency column and convert to numeric, parsing each distinct raw value once
+    
+    Everything except digits, the minus sign and the decimal separator is
+    stripped by a single pattern - currency symbols, codes and whichever
+    thousand separator is in use alike.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    
+    noise = re.compile(r'[^\d\-' + re.escape(decimal_sep) + ']')
+    cleaned = np.array(
+        [noise.sub('', str(value)).replace(decimal_sep, '.') for value in uniques],
+        dtype=object
+    )
+    parsed = pd.to_numeric(cleaned, errors='coerce')
+    
+    # Null values carry code -1, which picks the trailing NaN
+    if len(parsed) == 0 or (codes < 0).any():
+        parsed = np.append(parsed.astype(float), np.nan)
+    return pd.Series(parsed[codes], index=series.index, name=series.name)
+
+US_AMOUNT = re.compile(r'^\d{1,3}(?:,\d{3})+(?:\.\d+)?$|^\d+\.\d{1,2}$')
+EUROPEAN_AMOUNT = re.compile(r'^\d{1,3}(?:\.\d{3})+(?:,\d+)?$|^\d+,\d{1,2}$')
+SPACE_GROUPED_AMOUNT = re.compile(r'^\d{1,3}(?:\s\d{3})+(?:[.,]\d+)?$')
+CURRENCY_FORMAT_NAMES = {('.', ','): 'US', (',', '.'): 'European', ('.', ' '): 'Space', (',', ' '): 'Space'}
+
+def infer_currency_format(series, sample_size=TYPE_SAMPLE_SIZE):
+    """Guess (decimal_sep, thousand_sep) of a currency column by voting over a sample"""
+    sample = stratified_sample(series.dropna(), sample_size).astype(str)
+    amounts = sample.str.replace(r'[^\d.,\s]', '', regex=True).str.strip()
+    
+    us_votes = amounts.str.contains(US_AMOUNT).sum()
+    european_votes = amounts.str.contains(EUROPEAN_AMOUNT).sum()
+    space_votes = amounts.str.contains(SPACE_GROUPED_AMOUNT).sum()
+    
+    if space_votes > max(us_votes, european_votes):
+        comma_decimals = amounts.str.contains(r',\d{1,2}$').sum()
+        dot_decimals = amounts.str.contains(r'\.\d{1,2}$').sum()
+        return (',' if comma_decimals > dot_decimals else '.'), ' '
+    if european_votes > us_votes:
+        return ',', '.'
+    return '.', ','
+
+def _clean_currency_auto(series):
+    """Clean one currency column in its inferred format and count values that failed to parse"""
+    decimal_sep, thousand_sep = infer_currency_format(series)
+    cleaned = clean_currency_column(series, decimal_sep=decimal_sep, thousand_sep=thousand_sep)
+    failures = ~detect_missing_patterns(series).to_numpy() & cleaned.isna().to_numpy()
+    return {
+        'values': cleaned.to_numpy(),
+        'format': (decimal_sep, thousand_sep),
+        'failures': int(failures.sum())
+    }
+
+def clean_currency_columns(df, columns, max_workers=None, backend='process'):
+    """Clean several currency columns at once, each in its own inferred format
+    
+    Returns the cleaned frame and a per-column report of the detected format
+    and the number of non-missing values that could not be parsed.
+    """
+    results = map_columns(df, _clean_currency_auto, columns=columns,
+                          max_workers=max_workers, backend=backend)
+    df = df.copy(deep=False)
+    report = []
+    for col, result in results.items():
+        df[col] = result['values']
+        report.append({
+            'Column': col,
+            'Format': CURRENCY_FORMAT_NAMES[result['format']],
+            'Decimal': result['format'][0],
+            'Thousands': repr(result['format'][1]),
+            'Parse Failures': result['failures']
+        })
+    return df, pd.DataFrame(report)
+
+# ==================== DTYPE COMPACTION ====================
+
+TEXT_DTYPES = ['object', 'string', 'category']
+TRUE_TOKENS = {'true', 'yes', '1', 't', 'y'}
+ARROW_STRING_DTYPE = pd.StringDtype('pyarrow', na_value=np.nan)
+
+def _compact_boolean(series):
+    """Map a yes/no style text column to bool (or nullable boolean when it has gaps)"""
+    codes, uniques = pd.factorize(series)
+    lowered = pd.Index(uniques.astype(str)).str.strip().str.lower()
+    if not lowered.isin(list(BOOL_PATTERNS)).all():
+        return None
+    flags = np.append(lowered.isin(list(TRUE_TOKENS)), False)[codes]
+    if (codes == -1).any():
+        return pd.Series(pd.array(flags, dtype='boolean'), index=series.index).mask(codes == -1)
+    return pd.Series(flags, index=series.index)
+
+def compact_dtypes(df, column_types):
+    """Store each column in the smallest dtype its detected type allows
+    
+    Categorical text becomes `category`, yes/no text becomes bool, other
+    all-text columns become Arrow-backed strings and numbers are downcast
+    without changing any value.
+    Numeric 0/1 columns are only downcast, which is as small as bool and keeps
+    their arithmetic. Columns that do not fully fit a target dtype are left
+    as they are.
+    """
+    df = df.copy(deep=False)
+    for col in df.columns:
+        series = df[col]
+        if not (pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series)):
+            continue
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            continue
+        col_type = column_types.get(col, {}).get('type')
+        if col_type == 'boolean':
+            compacted = _compact_boolean(series)
+            if compacted is not None:
+                df[col] = compacted
+                continue
+        if col_type == 'categorical':
+            df[col] = series.astype('category')
+        elif series.dtype != ARROW_STRING_DTYPE and pd.api.types.infer_dtype(series, skipna=True) in ('string', 'empty'):
+            df[col] = series.astype(ARROW_STRING_DTYPE)
+    return downcast_numeric(df)
+
+# ==================== DATASET STATISTICS ====================
+
+def frame_summary(df):
+    """Row count, column count and deep memory usage, without the per-column value scans"""
+    return {
+        'rows': len(df),
+        'columns': len(df.columns),
+        'memory': int(df.memory_usage(deep=True).sum())
+    }
+
+def dataset_stats(df):
+    """Summary statistics for metric cards and the column table, computed once per frame
+    
+    Null counts and deep memory usage come from one frame-wide call each
+    instead of a scan per column and per metric.
+    """
+    null_counts = df.isna().sum()
+    memory = df.memory_usage(index=False, deep=True)
+    per_column = pd.DataFrame({
+        'non_null': len(df) - null_counts,
+        'null': null_counts,
+        'unique': df.nunique(),
+        'memory': memory
+    })
+    return {
+        'rows': len(df),
+        'columns': len(df.columns),
+        'memory': int(memory.sum()) + df.index.memory_usage(deep=True),
+        'missing': int(null_counts.sum()),
+        'per_column': per_column
+    }
+
+# ==================== CHART DATA ====================
+
+LINE_POINT_BUDGET = 5_000
+SCATTER_POINT_BUDGET = 20_000
+DENSITY_BINS = 200
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: positions of `threshold` points that keep a line's shape
+    
+    The first and last points are always kept; from each bucket in between,
+    the point forming the largest triangle with the previously kept point
+    and the next bucket's average is kept.
+    """
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else n
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+def minmax_indices(y, buckets):
+    """Positions of the minimum and maximum of each of `buckets` equal slices, in order"""
+    n = len(y)
+    if 2 * buckets >= n:
+        return np.arange(n)
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    sizes = np.diff(edges)
+    bucket_ids = np.repeat(np.arange(buckets), sizes)
+    
+    picked = []
+    for reduce in (np.minimum, np.maximum):
+        hits = np.flatnonzero(y == np.repeat(reduce.reduceat(y, edges[:-1]), sizes))
+        # First hit of each bucket, since ties can match several positions
+        picked.append(hits[np.r_[True, np.diff(bucket_ids[hits]) != 0]])
+    return np.unique(np.concatenate(picked))
+
+def downsample_line(x, y, max_points=LINE_POINT_BUDGET, method='lttb'):
+    """Positions of at most max_points points to draw a line series with"""
+    if method == 'minmax':
+        return minmax_indices(y, max(1, max_points // 2))
+    return lttb_indices(x, y, max_points)
+
+def sample_positions(n, max_points, seed=SAMPLE_SEED):
+    """Sorted random positions of at most max_points rows out of n"""
+    if n <= max_points:
+        return np.arange(n)
+    return np.sort(np.random.default_rng(seed).choice(n, max_points, replace=False))
+
+def density_grid(x, y, bins=DENSITY_BINS):
+    """2D histogram of a scatter as (counts[y, x], x bin centers, y bin centers)"""
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    return counts.T, (x_edges[:-1] + x_edges[1:]) / 2, (y_edges[:-1] + y_edges[1:]) / 2
+
+BOX_OUTLIER_SAMPLE = 1_000
+
+def finite_values(series):
+    """A numeric column's finite values as a float64 array"""
+    values = series.to_numpy(dtype='float64', na_value=np.nan)
+    return values[np.isfinite(values)]
+
+def histogram_stats(series, bins):
+    """Bin counts, edges and summary statistics of a numeric column"""
+    values = finite_values(series)
+    counts, edges = np.histogram(values, bins=bins)
+    count = len(values)
+    return {
+        'counts': counts,
+        'edges': edges,
+        'count': count,
+        'mean': values.mean() if count else np.nan,
+        'median': np.median(values) if count else np.nan,
+        'std': values.std(ddof=1) if count > 1 else np.nan
+    }
+
+def box_stats(series, max_outliers=BOX_OUTLIER_SAMPLE):
+    """Quartiles, 1.5 IQR whiskers and a capped sample of outliers, or None for an empty column"""
+    values = finite_values(series)
+    if not len(values):
+        return None
+    
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    outside = (values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)
+    inside = values[~outside]
+    outliers = values[outside]
+    return {
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'lower_whisker': inside.min(),
+        'upper_whisker': inside.max(),
+        'outlier_count': len(outliers),
+        'outliers': outliers[sample_positions(len(outliers), max_outliers)]
+    }
+
+CORRELATION_SAMPLE_ROWS = 50_000
+CORRELATION_ANNOTATE_MAX = 20  # Larger matrices are drawn without per-cell labels
+CORRELATION_BLOCK_COLUMNS = 64  # Columns converted to float64 at a time while centering
+
+def correlation_matrix(df, sample_rows=None, seed=SAMPLE_SEED):
+    """Pearson correlation of numeric columns from float32 matrix products
+    
+    Like DataFrame.corr, each pair uses the rows where both values are
+    present. Without missing values that is a single product of the
+    standardized matrix; otherwise sums over the pairwise masks are
+    products too. sample_rows limits the rows used, for a fast preview.
+    """
+    if sample_rows is not None and len(df) > sample_rows:
+        df = df.iloc[sample_positions(len(df), sample_rows, seed)]
+    centered = np.empty((len(df), df.shape[1]), dtype=np.float32)
+    present = np.empty(centered.shape, dtype=bool)
+    
+    # Centering each block in float64 keeps the float32 sums from cancelling,
+    # while only CORRELATION_BLOCK_COLUMNS columns are ever held at full width.
+    # np.errstate is per thread, unlike warning filters, so sessions can share it
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for start in range(0, df.shape[1], CORRELATION_BLOCK_COLUMNS):
+            stop = start + CORRELATION_BLOCK_COLUMNS
+            block = df.iloc[:, start:stop].to_numpy(dtype='float64', na_value=np.nan)
+            known = ~np.isnan(block)
+            block = np.where(known, block, 0)
+            block -= block.sum(axis=0) / known.sum(axis=0)
+            block[~known] = 0
+            present[:, start:stop] = known
+            centered[:, start:stop] = block
+        
+        if present.all():
+            centered /= np.sqrt(np.einsum('ij,ij->j', centered, centered))
+            corr = centered.T @ centered
+        else:
+            mask = present.astype(np.float32)
+            del present
+            counts = mask.T @ mask
+            sums = centered.T @ mask  # sums[i, j]: column i summed over rows where column j is present
+            products = centered.T @ centered
+            np.square(centered, out=centered)
+            squares = centered.T @ mask
+            covariance = products - sums * sums.T / counts
+            corr = covariance / np.sqrt((squares - sums ** 2 / counts) * (squares.T - sums.T ** 2 / counts))
+    
+    corr = np.clip(corr, -1, 1)
+    diagonal = np.diagonal(corr).copy()
+    np.fill_diagonal(corr, np.where(np.isnan(diagonal), np.nan, 1))
+    return pd.DataFrame(corr, index=df.columns, columns=df.columns)
+
+def top_correlations(corr, k=20):
+    """The k column pairs with the largest absolute correlation, strongest first"""
+    rows, cols = np.triu_indices(len(corr), k=1)
+    values = corr.to_numpy()[rows, cols]
+    known = ~np.isnan(values)
+    rows, cols, values = rows[known], cols[known], values[known]
+    
+    strength = -np.abs(values)
+    if k < len(values):
+        candidates = np.argpartition(strength, k)[:k]
+        order = candidates[np.argsort(strength[candidates], kind='stable')]
+    else:
+        order = np.argsort(strength, kind='stable')
+    return pd.DataFrame({
+        'Column A': corr.index[rows[order]],
+        'Column B': corr.columns[cols[order]],
+        'Correlation': values[order]
+    })
+
+def _fiedler_order(similarity):
+    """Positions sorted by the Fiedler vector of a connected similarity graph"""
+    if len(similarity) < 3:
+        return np.arange(len(similarity))
+    laplacian = np.diag(similarity.sum(axis=1)) - similarity
+    _, vectors = np.linalg.eigh(laplacian)
+    return np.argsort(vectors[:, 1], kind='stable')
+
+def clustered_order(corr):
+    """Columns reordered so strongly correlated ones sit next to each other
+    
+    Spectral seriation: columns are sorted by the Fiedler vector of the graph
+    whose edge weights are the absolute correlations. Each connected group of
+    columns is ordered on its own, largest first; constant and all-missing
+    columns correlate with nothing and go last.
+    """
+    similarity = np.nan_to_num(np.abs(corr.to_numpy(dtype='float64')))
+    np.fill_diagonal(similarity, 0)
+    linked = similarity > 0
+    isolated = ~linked.any(axis=1)
+    
+    components = []
+    assigned = isolated.copy()
+    for seed in range(len(similarity)):
+        if assigned[seed]:
+            continue
+        members = np.zeros(len(similarity), dtype=bool)
+        members[seed] = True
+        frontier = members.copy()
+        while frontier.any():
+            frontier = linked[frontier].any(axis=0) & ~members
+            members |= frontier
+        assigned |= members
+        component = np.flatnonzero(members)
+        components.append(component[_fiedler_order(similarity[np.ix_(component, component)])])
+    
+    components.sort(key=len, reverse=True)
+    order = np.concatenate(components + [np.flatnonzero(isolated)]).astype(int)
+    return corr.columns[order]
+
+# ==================== PARALLEL PROFILING ====================
+
+DEFAULT_PROFILE_WORKERS = min(32, os.cpu_count() or 1)
+PROFILE_MIN_CELLS = 1_000_000  # Below this, pool start-up costs more than it saves
+
+def _share_column(series):
+    """Copy a NumPy-backed column into shared memory, or return None if it must be pickled"""
+    if not isinstance(series.dtype, np.dtype) or series.dtype.kind not in 'biufcmM' or len(series) == 0:
+        return None
+    values = series.to_numpy()
+    shm = SharedMemory(create=True, size=values.nbytes)
+    np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+    return shm
+
+def _run_column_task(func, name, payload):
+    """Worker entry point: rebuild the column from shared memory or a pickle and apply func"""
+    if payload[0] == 'shm':
+        _, shm_name, dtype, length = payload
+        shm = SharedMemory(name=shm_name)
+        try:
+            values = np.ndarray((length,), dtype=dtype, buffer=shm.buf)
+            # The result must not keep a view on the segment once it is closed
+            return func(pd.Series(values.copy(), name=name))
+        finally:
+            shm.close()
+    return func(payload[1])
+
+def _restore_index(result, index):
+    """Re-attach the frame's index to Series results computed on a bare column"""
+    if isinstance(result, pd.Series) and len(result) == len(index):
+        result.index = index
+    return result
+
+def map_columns(df, func, columns=None, max_workers=None, backend='thread', progress_callback=None):
+    """Apply a per-column function to a frame, in a worker pool when it is worth it
+    
+    Results come back as a dict in column order. Small frames, a single
+    worker, the 'serial' backend, or any pool failure run the columns one
+    after another in the calling process, so the output never depends on
+    scheduling.
+    """
+    columns = list(df.columns if columns is None else columns)
+    if max_workers is None:
+        max_workers = DEFAULT_PROFILE_WORKERS
+    max_workers = min(max_workers, len(columns))
+    
+    parallel = (backend in ('process', 'thread') and max_workers > 1
+                and len(df) * len(columns) >= PROFILE_MIN_CELLS)
+    if parallel:
+        try:
+            if backend == 'process':
+                results = _map_columns_processes(df, func, columns, max_workers, progress_callback)
+            else:
+                results = _map_columns_threads(df, func, columns, max_workers, progress_callback)
+            return {col: results[col] for col in columns}
+        except Exception:
+            pass
+    
+    results = {}
+    for idx, col in enumerate(columns):
+        results[col] = func(df[col])
+        if progress_callback is not None:
+            progress_callback(idx + 1, len(columns))
+    return results
+
+def _map_columns_threads(df, func, columns, max_workers, progress_callback):
+    """Run func over columns in a thread pool"""
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(func, df[col]): col for col in columns}
+        for done, future in enumerate(as_completed(futures), 1):
+            results[futures[future]] = future.result()
+            if progress_callback is not None:
+                progress_callback(done, len(columns))
+    return results
+
+def _pool_context():
+    """Start workers from a fork server, or spawn them where there is none
+    
+    Plain fork would copy the server's threads and locks mid-flight. The fork
+    server preloads this module so workers do not each import pandas.
+    """
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    context = multiprocessing.get_context('forkserver')
+    context.set_forkserver_preload([__name__])
+    return context
+
+def _map_columns_processes(df, func, columns, max_workers, progress_callback):
+    """Run func over columns in a process pool, handing numeric buffers over via shared memory"""
+    segments = []
+    results = {}
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=_pool_context()) as pool:
+            futures = {}
+            for col in columns:
+                series = df[col]
+                shm = _share_column(series)
+                if shm is not None:
+                    segments.append(shm)
+                    payload = ('shm', shm.name, series.dtype.str, len(series))
+                else:
+                    payload = ('series', series.reset_index(drop=True))
+                futures[pool.submit(_run_column_task, func, col, payload)] = col
+            
+            for done, future in enumerate(as_completed(futures), 1):
+                col = futures[future]
+                results[col] = _restore_index(future.result(), df.index)
+                if progress_callback is not None:
+                    progress_callback(done, len(columns))
+    finally:
+        for shm in segments:
+            shm.close()
+            shm.unlink()
+    return results
+
+# ==================== CLEANING STEPS & RECIPES ====================
+
+RECIPE_VERSION = 1
+STEP_DESCRIPTIONS = {
+    'fill_missing': "Filled missing values in '{column}' ({method})",
+    'drop_missing_rows': "Dropped rows with missing '{column}'",
+    'drop_column': "Dropped column '{column}'",
+    'clean_currency': "Cleaned currency column '{column}'",
+    'clean_currency_columns': "Cleaned {count} currency columns",
+    'drop_duplicates': "Removed duplicate rows",
+    'trim_whitespace': "Trimmed whitespace from {count} columns",
+    'rename_column': "Renamed '{column}' to '{new_name}'",
+    'convert_type': "Converted '{column}' to {dtype}"
+}
+
+def make_step(op, column=None, columns=None, **params):
+    """Build a structured cleaning step"""
+    step = {'op': op, 'params': params}
+    if column is not None:
+        step['column'] = column
+    if columns is not None:
+        step['columns'] = list(columns)
+    return step
+
+MISSING_METHOD_FILLS = {
+    'Mean': ('mean', None),
+    'Median': ('median', None),
+    'Mode': ('mode', None),
+    'Forward Fill': ('ffill', None),
+    'Backward Fill': ('bfill', None),
+    'Replace with "Unknown"': ('constant', 'Unknown'),
+    'Replace with Empty String': ('constant', '')
+}
+
+def missing_treatment_step(column, method, value=None, tokens=MISSING_TOKENS):
+    """Translate a Missing Values tab treatment into a cleaning step"""
+    tokens = list(tokens)
+    if method == 'Drop Rows':
+        return make_step('drop_missing_rows', column=column, tokens=tokens)
+    if method == 'Drop Column':
+        return make_step('drop_column', column=column)
+    if method in MISSING_METHOD_FILLS:
+        fill_method, fill_value = MISSING_METHOD_FILLS[method]
+        if fill_method == 'constant':
+            return make_step('fill_missing', column=column, method='constant', value=fill_value, tokens=tokens)
+        return make_step('fill_missing', column=column, method=fill_method, tokens=tokens)
+    # Constant Value and Replace with Placeholder take the value typed by the user
+    return make_step('fill_missing', column=column, method='constant', value=value, tokens=tokens)
+
+def describe_step(step):
+    """Human-readable summary of a cleaning step for logs and history"""
+    return STEP_DESCRIPTIONS[step['op']].format(
+        column=step.get('column'), count=len(step.get('columns') or []), **step['params']
+    )
+
+def _step_missing_mask(df, step, missing_masks):
+    """Missing mask for a step's column, reusing a precomputed one when available"""
+    col = step['column']
+    if missing_masks is not None and col in missing_masks and len(missing_masks[col]) == len(df):
+        return missing_masks[col]
+    return detect_missing_patterns(df[col], tokens=step['params'].get('tokens', MISSING_TOKENS))
+
+def _fill_masked(series, missing, value):
+    """Replace masked values, first adding a new fill value to a categorical's categories"""
+    if isinstance(series.dtype, pd.CategoricalDtype) and pd.notna(value) and value not in series.cat.categories:
+        series = series.cat.add_categories([value])
+    return series.mask(missing, value)
+
+def apply_step(df, step, column_types, missing_masks=None, map_options=None):
+    """Apply one cleaning step without touching the input frame
+    
+    Returns the new frame, the updated column types and the step's effects:
+    changed columns, the kept-rows mask of a row filter, dropped columns,
+    renamed columns and an optional report.
+    """
+    op, params = step['op'], step['params']
+    col = step.get('column')
+    df = df.copy(deep=False)
+    column_types = dict(column_types)
+    effects = {'columns': [], 'keep': None, 'dropped': [], 'renamed': {}, 'report': None}
+    
+    if op == 'fill_missing':
+        missing = _step_missing_mask(df, step, missing_masks)
+        method = params['method']
+        if method == 'mean':
+            df[col] = _fill_masked(df[col], missing, df[col].mean())
+        elif method == 'median':
+            df[col] = _fill_masked(df[col], missing, df[col].median())
+        elif method == 'mode':
+            mode_val = df[col][~missing].mode()
+            if len(mode_val) > 0:
+                df[col] = _fill_masked(df[col], missing, mode_val.iloc[0])
+        elif method == 'constant':
+            df[col] = _fill_masked(df[col], missing, params['value'])
+        elif method == 'ffill':
+            df[col] = df[col].mask(missing).ffill()
+        elif method == 'bfill':
+            df[col] = df[col].mask(missing).bfill()
+        else:
+            raise ValueError(f"Unknown fill method '{method}'")
+        effects['columns'] = [col]
+    
+    elif op == 'drop_missing_rows':
+        keep = ~_step_missing_mask(df, step, missing_masks).to_numpy()
+        df = df[keep]
+        effects['keep'] = keep
+    
+    elif op == 'drop_column':
+        df = df.drop(columns=[col])
+        column_types.pop(col, None)
+        effects['dropped'] = [col]
+    
+    elif op == 'clean_currency':
+        df[col] = clean_currency_column(df[col], **params)
+        column_types[col] = {'type': 'numerical', 'confidence': 'high'}
+        effects['columns'] = [col]
+    
+    elif op == 'clean_currency_columns':
+        columns = step['columns']
+        df, effects['report'] = clean_currency_columns(df, columns, **(map_options or {}))
+        for currency_col in columns:
+            column_types[currency_col] = {'type': 'numerical', 'confidence': 'high'}
+        effects['columns'] = columns
+    
+    elif op == 'drop_duplicates':
+        keep = ~df.duplicated().to_numpy()
+        df = df[keep]
+        effects['keep'] = keep
+    
+    elif op == 'trim_whitespace':
+        columns = step.get('columns') or df.select_dtypes(include=TEXT_DTYPES).columns.tolist()
+        for text_col in columns:
+            trimmed = df[text_col].astype(str).str.strip()
+            if isinstance(df[text_col].dtype, pd.CategoricalDtype):
+                trimmed = trimmed.astype('category')
+            df[text_col] = trimmed
+        effects['columns'] = columns
+    
+    elif op == 'rename_column':
+        new_name = params['new_name']
+        if new_name in df.columns:
+            raise ValueError(f"Column '{new_name}' already exists")
+        df = df.rename(columns={col: new_name})
+        if col in column_types:
+            column_types[new_name] = column_types.pop(col)
+        effects['renamed'] = {col: new_name}
+    
+    elif op == 'convert_type':
+        if params['dtype'] == 'datetime':
+            df[col] = pd.to_datetime(df[col])
+        else:
+            df[col] = df[col].astype(params['dtype'])
+        effects['columns'] = [col]
+    
+    else:
+        raise ValueError(f"Unknown cleaning step '{op}'")
+    
+    return df, column_types, effects
+
+def replay_recipe(df, steps, column_types=None, map_options=None):
+    """Apply a list of recorded cleaning steps to a frame, outside of the UI"""
+    column_types = dict(column_types or {})
+    for number, step in enumerate(steps, 1):
+        try:
+            df, column_types, _ = apply_step(df, step, column_types, map_options=map_options)
+        except Exception as e:
+            raise ValueError(f"Step {number} ({describe_step(step)}) failed: {e}") from e
+    return df, column_types
+
+def recipe_to_json(steps):
+    """Serialize cleaning steps as a portable JSON recipe"""
+    return json.dumps({'version': RECIPE_VERSION, 'steps': steps}, indent=2, default=str)
+
+def load_recipe(text):
+    """Parse and validate a JSON recipe, returning its steps"""
+    recipe = json.loads(text)
+    if not isinstance(recipe, dict) or recipe.get('version') != RECIPE_VERSION:
+        raise ValueError(f"Unsupported recipe format (expected version {RECIPE_VERSION})")
+    for number, step in enumerate(recipe['steps'], 1):
+        if step.get('op') not in STEP_DESCRIPTIONS:
+            raise ValueError(f"Step {number} has unknown operation '{step.get('op')}'")
+        step.setdefault('params', {})
+    return recipe['steps']
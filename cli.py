@@ -0,0 +1,160 @@
+"""Headless batch cleaning: python cli.py data/*.csv --output-dir cleaned"""
+import argparse
+import glob
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from cleaning_engine import (
+    CSV_CHUNK_ROWS, clean_currency_columns, detect_column_type, detect_missing_patterns,
+    load_recipe, map_columns, read_table, replay_recipe
+)
+
+SUPPORTED_EXTENSIONS = ('csv', 'xlsx', 'xls', 'parquet', 'feather', 'arrow')
+
+def collect_files(patterns, exclude_dir=None):
+    """Expand file paths, directories and glob patterns into a sorted list of data files
+    
+    Directories are walked recursively and `**` in a pattern matches any
+    number of subdirectories. Files under exclude_dir, such as the output
+    directory of an earlier run, are skipped.
+    """
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = [
+                os.path.join(root, name) for root, _, names in os.walk(pattern) for name in names
+            ]
+        else:
+            candidates = glob.glob(pattern, recursive=True) or [pattern]
+        for path in candidates:
+            if os.path.isfile(path) and path.rsplit('.', 1)[-1].lower() in SUPPORTED_EXTENSIONS:
+                files.add(os.path.normpath(path))
+    
+    if exclude_dir is not None:
+        excluded = os.path.abspath(exclude_dir)
+        files = {path for path in files if os.path.commonpath([os.path.abspath(path), excluded]) != excluded}
+    return sorted(files)
+
+def output_paths(files, output_dir):
+    """Map every input file to its own cleaned CSV path under output_dir
+    
+    Subdirectories below the inputs' common directory are mirrored, and files
+    that share a name in one directory keep their extension in the output
+    name, so no two inputs write to the same file.
+    """
+    base = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in files])
+    stems = {path: os.path.splitext(os.path.relpath(os.path.abspath(path), base)) for path in files}
+    stem_counts = Counter(stem for stem, _ in stems.values())
+    return {
+        path: os.path.join(
+            output_dir, f"{stem}_{extension[1:]}_cleaned.csv" if stem_counts[stem] > 1 else f"{stem}_cleaned.csv"
+        )
+        for path, (stem, extension) in stems.items()
+    }
+
+def clean_file(path, output_path, steps=None, reader_options=None):
+    """Clean one file end to end and return its size and per-stage timings
+
+    Without a recipe, every detected currency column is cleaned in its
+    inferred format; with one, the recipe's steps are replayed instead.
+    """
+    timings = {}
+    started = time.perf_counter()
+    extension = path.rsplit('.', 1)[-1].lower()
+
+    with open(path, 'rb') as file:
+        df = read_table(file, extension, **(reader_options if extension == 'csv' else {}))
+    timings['read'] = time.perf_counter() - started
+
+    # Files are already spread over processes, so columns run serially here
+    stage = time.perf_counter()
+    column_types = map_columns(df, detect_column_type, backend='serial')
+    timings['profile'] = time.perf_counter() - stage
+
+    stage = time.perf_counter()
+    currency_cols = [col for col, info in column_types.items() if info['type'] == 'currency']
+    if steps is not None:
+        df, column_types = replay_recipe(df, steps, column_types, map_options={'backend': 'serial'})
+    elif currency_cols:
+        df, _ = clean_currency_columns(df, currency_cols, backend='serial')
+    missing_cells = sum(int(detect_missing_patterns(df[col]).sum()) for col in df.columns)
+    timings['clean'] = time.perf_counter() - stage
+
+    stage = time.perf_counter()
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    df.to_csv(output_path, index=False)
+    timings['write'] = time.perf_counter() - stage
+    timings['total'] = time.perf_counter() - started
+
+    return {
+        'file': path,
+        'output': output_path,
+        'rows': len(df),
+        'columns': len(df.columns),
+        'currency_columns': len(currency_cols),
+        'missing_cells': missing_cells,
+        'timings': timings
+    }
+
+def format_result(result):
+    """One-line summary of a cleaned file with its stage timings"""
+    timings = result['timings']
+    return (
+        f"{result['file']}: {result['rows']:,} rows x {result['columns']} cols, "
+        f"{result['currency_columns']} currency cols, {result['missing_cells']:,} missing cells | "
+        f"read {timings['read']:.2f}s, profile {timings['profile']:.2f}s, "
+        f"clean {timings['clean']:.2f}s, write {timings['write']:.2f}s, "
+        f"total {timings['total']:.2f}s -> {result['output']}"
+    )
+
+def parse_args(argv=None):
+    """Command-line options for the batch runner"""
+    parser = argparse.ArgumentParser(description="Clean many CSV/Excel/Parquet/Feather files without the web UI")
+    parser.add_argument('inputs', nargs='+', help="Files, directories (walked recursively) or glob patterns to clean")
+    parser.add_argument('-o', '--output-dir', default='cleaned', help="Where cleaned CSVs are written")
+    parser.add_argument('-r', '--recipe', help="JSON recipe exported from the app to replay on every file")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                        help="Files processed concurrently")
+    parser.add_argument('--chunksize', type=int, default=CSV_CHUNK_ROWS, help="CSV rows parsed per chunk")
+    parser.add_argument('--max-rows', type=int, default=None, help="Stop reading each CSV after this many rows")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Clean every matched file, printing a timing line per file as it finishes"""
+    args = parse_args(argv)
+    files = collect_files(args.inputs, exclude_dir=args.output_dir)
+    if not files:
+        print("No CSV, Excel, Parquet or Feather files matched", file=sys.stderr)
+        return 1
+
+    steps = None
+    if args.recipe:
+        with open(args.recipe, encoding='utf-8') as recipe_file:
+            steps = load_recipe(recipe_file.read())
+    outputs = output_paths(files, args.output_dir)
+    reader_options = {'chunksize': args.chunksize, 'max_rows': args.max_rows}
+
+    started = time.perf_counter()
+    failures = 0
+    workers = max(1, min(args.workers, len(files)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(clean_file, path, outputs[path], steps, reader_options): path
+            for path in files
+        }
+        for future in as_completed(futures):
+            try:
+                print(format_result(future.result()), flush=True)
+            except Exception as e:
+                failures += 1
+                print(f"{futures[future]}: FAILED - {e}", file=sys.stderr, flush=True)
+
+    print(f"Cleaned {len(files) - failures}/{len(files)} files in "
+          f"{time.perf_counter() - started:.2f}s with {workers} workers")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())